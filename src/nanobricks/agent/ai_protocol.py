@@ -1,6 +1,9 @@
 """Protocol adapter abstraction for AI communication protocols."""
 
 import asyncio
+import itertools
+import os
+import secrets
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from dataclasses import dataclass, field
@@ -23,7 +26,31 @@ class ProtocolType(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+# Message and component IDs only need to be unique per process: a random
+# per-process prefix plus a counter avoids a urandom read and UUID formatting
+# per ID
+_id_prefix = ""
+_id_counter = itertools.count()
+
+
+def _reset_ids() -> None:
+    """Start a fresh ID prefix, e.g. in a forked child."""
+    global _id_prefix, _id_counter
+    _id_prefix = f"{os.getpid()}-{secrets.token_hex(4)}-"
+    _id_counter = itertools.count()
+
+
+_reset_ids()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_ids)
+
+
+def next_id() -> str:
+    """Return a new process-unique ID for a protocol message or component."""
+    return f"{_id_prefix}{next(_id_counter):x}"
+
+
+@dataclass(slots=True)
 class Message:
     """Generic message for protocol communication."""
 
@@ -84,7 +111,22 @@ class AIProtocolAdapter(Protocol):
 
 
 class BaseAIProtocolAdapter(ABC):
-    """Base class for AI protocol adapters."""
+    """Base class for AI protocol adapters.
+
+    Subclasses can register themselves with ``ProtocolRegistry`` by naming
+    their protocol in the class statement::
+
+        class MyAdapter(BaseAIProtocolAdapter, protocol_type=ProtocolType.CUSTOM):
+            ...
+    """
+
+    def __init_subclass__(
+        cls, protocol_type: ProtocolType | None = None, **kwargs: Any
+    ) -> None:
+        """Register the subclass for ``protocol_type`` when one is given."""
+        super().__init_subclass__(**kwargs)
+        if protocol_type is not None:
+            ProtocolRegistry.register(protocol_type, cls)
 
     def __init__(self, config: ProtocolConfig):
         """Initialize adapter."""
@@ -85,7 +85,7 @@ class RegistryBackend(ABC):
 
     @abstractmethod
     async def list_versions(self, name: str) -> list[Version]:
-        """List all versions of a package."""
+        """List all versions of a package, newest first."""
         pass
 
 
@@ -335,7 +335,7 @@ class RegistryClient:
         # Find best version
         if version_spec:
             constraint = VersionRange.parse(version_spec)
-            best_version = find_best_version(versions, constraint)
+            best_version = find_best_version(versions, constraint, sorted_desc=True)
             if not best_version:
                 return None
         else:
@@ -1,8 +1,34 @@
 """Version management for nanobrick packages."""
 
 import re
-from dataclasses import dataclass
+import string
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+from typing import Any, TypedDict
+
+_IDENTIFIER_CHARS = frozenset(string.ascii_letters + string.digits + "-")
+
+
+def _is_numeric(part: str) -> bool:
+    """Check for a non-empty, ASCII-only, leading-zero-free number."""
+    return part.isascii() and part.isdigit() and (part == "0" or part[0] != "0")
+
+
+def _valid_identifiers(text: str, strict_numeric: bool) -> bool:
+    """Check dot-separated SemVer identifiers (prerelease or build)."""
+    for part in text.split("."):
+        if not part or not _IDENTIFIER_CHARS.issuperset(part):
+            return False
+        if strict_numeric and part.isdigit() and not _is_numeric(part):
+            return False
+    return True
+
+
+# (major, minor, patch, prerelease key); see ``Version.__post_init__``
+_SortKey = tuple[int, int, int, tuple[Any, ...]]
 
 
 class VersionPart(Enum):
@@ -15,24 +41,60 @@ class VersionPart(Enum):
     BUILD = "build"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Version:
-    """Semantic version representation."""
+    """Semantic version representation.
+
+    Versions are immutable, so the ordering key computed at construction
+    always matches the fields.
+    """
 
     major: int
     minor: int
     patch: int
     prerelease: str | None = None
     build: str | None = None
+    _sort_key: _SortKey = field(init=False, repr=False, compare=False)
 
     # Regex for parsing semantic versions
     VERSION_PATTERN = re.compile(
         r"^(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)"
         r"(?:-(?P<prerelease>(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)"
         r"(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?"
-        r"(?:\+(?P<build>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$"
+        r"(?:\+(?P<build>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$",
+        re.ASCII,
     )
 
+    def __post_init__(self) -> None:
+        """Precompute the ordering key.
+
+        Prerelease identifiers are pre-split into ``(0, int)`` / ``(1, str)``
+        pairs so numeric identifiers sort below alphanumeric ones, and a
+        release (no prerelease) is encoded as ``(1,)`` so it sorts above any
+        prerelease ``(0, ...)`` of the same version.
+
+        Prerelease and build strings are interned since tokens such as
+        ``alpha`` or ``rc.1`` repeat across many versions.
+        """
+        if self.prerelease is not None:
+            object.__setattr__(self, "prerelease", sys.intern(self.prerelease))
+        if self.build is not None:
+            object.__setattr__(self, "build", sys.intern(self.build))
+
+        if self.prerelease is None:
+            pre_key: tuple[Any, ...] = (1,)
+        else:
+            pre_key = (
+                0,
+                tuple(
+                    (0, int(part)) if part.isdigit() else (1, part)
+                    for part in self.prerelease.split(".")
+                ),
+            )
+        object.__setattr__(
+            self, "_sort_key", (self.major, self.minor, self.patch, pre_key)
+        )
+
     def __str__(self) -> str:
         """String representation."""
         version = f"{self.major}.{self.minor}.{self.patch}"
@@ -46,20 +108,56 @@ class Version:
         """Debug representation."""
         return f"Version({str(self)})"
 
+    @classmethod
+    def _parse_fast(cls, version_string: str) -> "Version | None":
+        """Parse a version with a single ``find`` scan instead of the regex.
+
+        The first ``+`` starts build metadata and the first ``-`` before it
+        starts the prerelease, so both are taken as slices of the input.
+        Returns None when the string is not a valid version, leaving the
+        regex path to produce the error.
+        """
+        plus_idx = version_string.find("+")
+        head = version_string if plus_idx < 0 else version_string[:plus_idx]
+        dash_idx = head.find("-")
+        core = head if dash_idx < 0 else head[:dash_idx]
+
+        parts = core.split(".")
+        if len(parts) != 3 or not all(_is_numeric(part) for part in parts):
+            return None
+
+        prerelease = None
+        if dash_idx >= 0:
+            prerelease = head[dash_idx + 1 :]
+            if not _valid_identifiers(prerelease, strict_numeric=True):
+                return None
+
+        build = None
+        if plus_idx >= 0:
+            build = version_string[plus_idx + 1 :]
+            if not _valid_identifiers(build, strict_numeric=False):
+                return None
+
+        return cls(int(parts[0]), int(parts[1]), int(parts[2]), prerelease, build)
+
     @classmethod
     def parse(cls, version_string: str) -> "Version":
         """Parse version string."""
+        version = cls._parse_fast(version_string)
+        if version is not None:
+            return version
+
         match = cls.VERSION_PATTERN.match(version_string)
         if not match:
             raise ValueError(f"Invalid version string: {version_string}")
 
-        groups = match.groupdict()
+        major, minor, patch, prerelease, build = match.group(1, 2, 3, 4, 5)
         return cls(
-            major=int(groups["major"]),
-            minor=int(groups["minor"]),
-            patch=int(groups["patch"]),
-            prerelease=groups.get("prerelease"),
-            build=groups.get("build"),
+            major=int(major),
+            minor=int(minor),
+            patch=int(patch),
+            prerelease=prerelease,
+            build=build,
         )
 
     def bump(self, part: VersionPart) -> "Version":
@@ -78,7 +176,11 @@ class Version:
         return self.prerelease is not None
 
     def _compare_prerelease(self, other: "Version") -> int:
-        """Compare prerelease versions."""
+        """Compare prerelease versions.
+
+        Reference implementation of SemVer prerelease precedence; ordering
+        operators use the precomputed ``_sort_key`` instead.
+        """
         # No prerelease is greater than any prerelease
         if self.prerelease is None and other.prerelease is not None:
             return 1
@@ -116,80 +218,157 @@ class Version:
 
     def __lt__(self, other: "Version") -> bool:
         """Less than comparison."""
-        # Compare major.minor.patch
-        if (self.major, self.minor, self.patch) < (
-            other.major,
-            other.minor,
-            other.patch,
-        ):
-            return True
-        if (self.major, self.minor, self.patch) > (
-            other.major,
-            other.minor,
-            other.patch,
-        ):
-            return False
-
-        # Same version, compare prerelease
-        return self._compare_prerelease(other) < 0
+        return self._sort_key < other._sort_key
 
     def __le__(self, other: "Version") -> bool:
         """Less than or equal comparison."""
-        return self < other or self == other
+        return self._sort_key <= other._sort_key
 
     def __gt__(self, other: "Version") -> bool:
         """Greater than comparison."""
-        return not self <= other
+        return self._sort_key > other._sort_key
 
     def __ge__(self, other: "Version") -> bool:
         """Greater than or equal comparison."""
-        return not self < other
+        return self._sort_key >= other._sort_key
 
     def __eq__(self, other: object) -> bool:
-        """Equality comparison."""
-        if not isinstance(other, Version):
-            return False
-        return (
-            self.major == other.major
-            and self.minor == other.minor
-            and self.patch == other.patch
-            and self.prerelease == other.prerelease
-            and self.build == other.build
-        )
+        """Equality comparison.
+
+        Build metadata is ignored, as SemVer excludes it from precedence.
+        """
+        # Exact class check first; isinstance only matters for subclasses
+        if other.__class__ is Version or isinstance(other, Version):
+            return self._sort_key == other._sort_key
+        return NotImplemented
 
     def __hash__(self) -> int:
-        """Hash for use in sets/dicts."""
-        return hash((self.major, self.minor, self.patch, self.prerelease, self.build))
+        """Hash for use in sets/dicts (consistent with ``__eq__``)."""
+        return hash(self._sort_key)
+
+
+def _make_tester(
+    min_key: _SortKey | None,
+    max_key: _SortKey | None,
+    min_inclusive: bool,
+    max_inclusive: bool,
+) -> Callable[[_SortKey], bool]:
+    """Build a predicate over version sort keys with the bounds bound as locals.
+
+    Each shape of range gets its own closure so that ``contains`` is a
+    couple of tuple comparisons with no attribute lookups or branching on
+    inclusivity.
+    """
+    if min_key is None:
+        if max_key is None:
+            return lambda key: True
+        hi = max_key
+        if max_inclusive:
+            return lambda key: key <= hi
+        return lambda key: key < hi
+
+    lo = min_key
+    if max_key is None:
+        if min_inclusive:
+            return lambda key: key >= lo
+        return lambda key: key > lo
+
+    hi = max_key
+    if lo == hi and min_inclusive and max_inclusive:
+        # Exact pins (==X.Y.Z) reduce to a single key comparison
+        return lambda key: key == lo
+    if min_inclusive:
+        if max_inclusive:
+            return lambda key: lo <= key <= hi
+        return lambda key: lo <= key < hi
+    if max_inclusive:
+        return lambda key: lo < key <= hi
+    return lambda key: lo < key < hi
+
+
+_CONSTRAINT_PATTERN = re.compile(r"^(>=|<=|==|>|<|\^|~)?\s*(.+)$")
+
+
+class _Bounds(TypedDict, total=False):
+    """Keyword arguments for ``VersionRange`` collected while parsing."""
+
+    min_version: Version
+    max_version: Version
+    min_inclusive: bool
+    max_inclusive: bool
+
+
+def _set_min(bounds: _Bounds, version: Version, inclusive: bool) -> None:
+    bounds["min_version"] = version
+    bounds["min_inclusive"] = inclusive
+
 
+def _set_max(bounds: _Bounds, version: Version, inclusive: bool) -> None:
+    bounds["max_version"] = version
+    bounds["max_inclusive"] = inclusive
 
-@dataclass
+
+def _set_exact(bounds: _Bounds, version: Version) -> None:
+    _set_min(bounds, version, True)
+    _set_max(bounds, version, True)
+
+
+def _set_caret(bounds: _Bounds, base: Version) -> None:
+    # Compatible versions: >=base, <next major
+    _set_min(bounds, base, True)
+    _set_max(bounds, Version(base.major + 1, 0, 0), False)
+
+
+def _set_tilde(bounds: _Bounds, base: Version) -> None:
+    # Approximately equal: >=base, <next minor
+    _set_min(bounds, base, True)
+    _set_max(bounds, Version(base.major, base.minor + 1, 0), False)
+
+
+# Constraint operator -> update of the VersionRange keyword arguments; a bare
+# version is an exact pin
+_CONSTRAINT_OPS: dict[str | None, Callable[[_Bounds, Version], None]] = {
+    ">=": lambda b, v: _set_min(b, v, True),
+    ">": lambda b, v: _set_min(b, v, False),
+    "<=": lambda b, v: _set_max(b, v, True),
+    "<": lambda b, v: _set_max(b, v, False),
+    "==": _set_exact,
+    None: _set_exact,
+    "^": _set_caret,
+    "~": _set_tilde,
+}
+
+
+@dataclass(frozen=True)
 class VersionRange:
-    """Version range specification."""
+    """Version range specification.
+
+    Ranges are immutable, so the membership predicate compiled at
+    construction always matches the bounds.
+    """
 
     min_version: Version | None = None
     max_version: Version | None = None
     min_inclusive: bool = True
     max_inclusive: bool = True
+    _test: Callable[[_SortKey], bool] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Compile the bounds into a membership predicate."""
+        object.__setattr__(
+            self,
+            "_test",
+            _make_tester(
+                self.min_version._sort_key if self.min_version else None,
+                self.max_version._sort_key if self.max_version else None,
+                self.min_inclusive,
+                self.max_inclusive,
+            ),
+        )
 
     def contains(self, version: Version) -> bool:
         """Check if version is in range."""
-        if self.min_version:
-            if self.min_inclusive:
-                if version < self.min_version:
-                    return False
-            else:
-                if version <= self.min_version:
-                    return False
-
-        if self.max_version:
-            if self.max_inclusive:
-                if version > self.max_version:
-                    return False
-            else:
-                if version >= self.max_version:
-                    return False
-
-        return True
+        return self._test(version._sort_key)
 
     @classmethod
     def parse(cls, spec: str) -> "VersionRange":
@@ -201,92 +380,16 @@ class VersionRange:
             "~1.2.0" - Approximately 1.2.0 (>=1.2.0, <1.3.0)
             ">1.0.0,<2.0.0" - Between 1.0.0 and 2.0.0
         """
-        # Handle caret (^) - compatible versions
-        if spec.startswith("^"):
-            base = Version.parse(spec[1:])
-            return cls(
-                min_version=base,
-                max_version=Version(base.major + 1, 0, 0),
-                min_inclusive=True,
-                max_inclusive=False,
-            )
+        bounds: _Bounds = {}
 
-        # Handle tilde (~) - approximately equal
-        if spec.startswith("~"):
-            base = Version.parse(spec[1:])
-            return cls(
-                min_version=base,
-                max_version=Version(base.major, base.minor + 1, 0),
-                min_inclusive=True,
-                max_inclusive=False,
-            )
+        for part in spec.split(","):
+            match = _CONSTRAINT_PATTERN.match(part.strip())
+            if not match:
+                raise ValueError(f"Invalid version range: {spec}")
+            op, version_string = match.group(1, 2)
+            _CONSTRAINT_OPS[op](bounds, Version.parse(version_string))
 
-        # Handle compound specifications
-        if "," in spec:
-            parts = spec.split(",")
-            range_obj = cls()
-
-            for part in parts:
-                part = part.strip()
-                if part.startswith(">="):
-                    range_obj.min_version = Version.parse(part[2:])
-                    range_obj.min_inclusive = True
-                elif part.startswith(">"):
-                    range_obj.min_version = Version.parse(part[1:])
-                    range_obj.min_inclusive = False
-                elif part.startswith("<="):
-                    range_obj.max_version = Version.parse(part[2:])
-                    range_obj.max_inclusive = True
-                elif part.startswith("<"):
-                    range_obj.max_version = Version.parse(part[1:])
-                    range_obj.max_inclusive = False
-                elif part.startswith("=="):
-                    version = Version.parse(part[2:])
-                    range_obj.min_version = version
-                    range_obj.max_version = version
-                    range_obj.min_inclusive = True
-                    range_obj.max_inclusive = True
-
-            return range_obj
-
-        # Handle single specifications
-        if spec.startswith(">="):
-            return cls(
-                min_version=Version.parse(spec[2:]),
-                min_inclusive=True,
-            )
-        elif spec.startswith(">"):
-            return cls(
-                min_version=Version.parse(spec[1:]),
-                min_inclusive=False,
-            )
-        elif spec.startswith("<="):
-            return cls(
-                max_version=Version.parse(spec[2:]),
-                max_inclusive=True,
-            )
-        elif spec.startswith("<"):
-            return cls(
-                max_version=Version.parse(spec[1:]),
-                max_inclusive=False,
-            )
-        elif spec.startswith("=="):
-            version = Version.parse(spec[2:])
-            return cls(
-                min_version=version,
-                max_version=version,
-                min_inclusive=True,
-                max_inclusive=True,
-            )
-        else:
-            # Assume exact version
-            version = Version.parse(spec)
-            return cls(
-                min_version=version,
-                max_version=version,
-                min_inclusive=True,
-                max_inclusive=True,
-            )
+        return cls(**bounds)
 
     def __str__(self) -> str:
         """String representation."""
@@ -312,6 +415,7 @@ def find_best_version(
     available: list[Version],
     constraint: VersionRange,
     prefer_stable: bool = True,
+    sorted_desc: bool = False,
 ) -> Version | None:
     """Find the best version matching constraints.
 
@@ -319,26 +423,54 @@ def find_best_version(
         available: List of available versions
         constraint: Version range constraint
         prefer_stable: Prefer stable over prerelease versions
+        sorted_desc: Whether ``available`` is already sorted newest first,
+            allowing the scan to stop at the first acceptable match
 
     Returns:
         Best matching version or None
     """
-    # Filter matching versions
-    matching = [v for v in available if constraint.contains(v)]
+    if sorted_desc:
+        first_match: Version | None = None
+        for version in available:
+            if not constraint.contains(version):
+                continue
+            if not prefer_stable or not version.is_prerelease():
+                return version
+            if first_match is None:
+                first_match = version
+        return first_match
+
+    # Single pass tracking the highest match and the highest stable match,
+    # instead of materializing and sorting the matching list
+    best: Version | None = None
+    best_stable: Version | None = None
+
+    for version in available:
+        if not constraint.contains(version):
+            continue
+        key = version._sort_key
+        if best is None or key > best._sort_key:
+            best = version
+        if (
+            prefer_stable
+            and not version.is_prerelease()
+            and (best_stable is None or key > best_stable._sort_key)
+        ):
+            best_stable = version
 
-    if not matching:
-        return None
+    if best_stable is not None:
+        return best_stable
+    return best
 
-    # Sort by version (highest first)
-    matching.sort(reverse=True)
 
-    # Prefer stable versions if requested
-    if prefer_stable:
-        stable = [v for v in matching if not v.is_prerelease()]
-        if stable:
-            return stable[0]
+@lru_cache(maxsize=256)
+def _parse_constraint(spec: str) -> VersionRange:
+    """Parse a constraint string, sharing results for repeated specs.
 
-    return matching[0]
+    The returned range is shared between callers, which is safe because
+    ``VersionRange`` is frozen.
+    """
+    return VersionRange.parse(spec)
 
 
 def resolve_dependencies(
@@ -363,7 +495,7 @@ def resolve_dependencies(
         if package not in available_packages:
             raise ValueError(f"Package not found: {package}")
 
-        constraint = VersionRange.parse(constraint_str)
+        constraint = _parse_constraint(constraint_str)
         available = available_packages[package]
 
         best_version = find_best_version(available, constraint)
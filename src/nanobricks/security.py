@@ -2,6 +2,7 @@
 
 import asyncio
 import hashlib
+import re
 import time
 from collections import defaultdict
 from collections.abc import Callable
@@ -40,6 +41,17 @@ class SecurityContext:
 class InputSanitizer(NanobrickProtocol[T_in, T_in, T_deps]):
     """Sanitizes input to prevent injection attacks."""
 
+    # Options compiled into ``_sanitize_string``; setting one rebuilds it
+    _SANITIZER_OPTIONS = frozenset(
+        {
+            "html_escape",
+            "sql_escape",
+            "max_length",
+            "allowed_chars",
+            "custom_sanitizer",
+        }
+    )
+
     def __init__(
         self,
         brick: NanobrickProtocol[T_in, T_out, T_deps],
@@ -59,41 +71,111 @@ class InputSanitizer(NanobrickProtocol[T_in, T_in, T_deps]):
         self.name = f"InputSanitizer[{brick.name}]"
         self.version = brick.version
 
-    def _sanitize_string(self, value: str) -> str:
-        """Sanitize a string value."""
-        if self.max_length and len(value) > self.max_length:
-            value = value[: self.max_length]
+        self._sanitize_string = self._build_string_sanitizer()
 
-        if self.allowed_chars:
-            value = "".join(c for c in value if c in self.allowed_chars)
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute, rebuilding the string sanitizer for options."""
+        super().__setattr__(name, value)
+        if name in self._SANITIZER_OPTIONS and "_sanitize_string" in self.__dict__:
+            self._sanitize_string = self._build_string_sanitizer()
 
-        if self.html_escape:
-            value = (
-                value.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&#x27;")
-            )
+    def _build_string_sanitizer(self) -> Callable[[str], str]:
+        """Specialize string sanitization to the configured options.
 
+        Only the enabled steps are kept, with their settings bound as closure
+        locals, so sanitizing a string never re-checks the options.
+        """
+        steps: list[Callable[[str], str]] = []
+
+        max_length = self.max_length
+        if max_length:
+            # Slicing a string that is already short enough returns it as-is
+            steps.append(lambda value: value[:max_length])
+
+        if self.allowed_chars:
+            allowed = frozenset(self.allowed_chars)
+            if all(ord(c) < 256 for c in allowed):
+                # Latin-1 whitelist: filter in C via a bytes deletion table;
+                # characters outside Latin-1 are disallowed and dropped by
+                # the encode step
+                delete = bytes(i for i in range(256) if chr(i) not in allowed)
+                steps.append(
+                    lambda value: (
+                        value.encode("latin-1", "ignore")
+                        .translate(None, delete)
+                        .decode("latin-1")
+                    )
+                )
+            else:
+                steps.append(lambda value: "".join(c for c in value if c in allowed))
+
+        # HTML and SQL escaping fused into one translation table. HTML
+        # escaping already removes single quotes, so SQL only adds the
+        # backslash rule when both are enabled.
+        escapes: dict[str, str] = {}
         if self.sql_escape:
-            value = value.replace("'", "''").replace("\\", "\\\\")
+            escapes.update({"'": "''", "\\": "\\\\"})
+        if self.html_escape:
+            escapes.update(
+                {
+                    "&": "&amp;",
+                    "<": "&lt;",
+                    ">": "&gt;",
+                    '"': "&quot;",
+                    "'": "&#x27;",
+                }
+            )
+        if escapes:
+            table = str.maketrans(escapes)
+            probe = re.compile("[" + re.escape("".join(escapes)) + "]").search
+            # Strings without escapable characters are returned without copying
+            steps.append(
+                lambda value: value.translate(table) if probe(value) else value
+            )
 
         if self.custom_sanitizer:
-            value = self.custom_sanitizer(value)
+            steps.append(self.custom_sanitizer)
 
-        return value
+        if not steps:
+            return lambda value: value
+        if len(steps) == 1:
+            return steps[0]
+
+        def sanitize(value: str) -> str:
+            for step in steps:
+                value = step(value)
+            return value
+
+        return sanitize
 
     def _sanitize_value(self, value: Any) -> Any:
-        """Recursively sanitize values."""
+        """Recursively sanitize values.
+
+        Containers are only copied once a child actually changes; clean
+        payloads are returned as the same object.
+        """
         if isinstance(value, str):
             return self._sanitize_string(value)
         elif isinstance(value, dict):
-            return {k: self._sanitize_value(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._sanitize_value(v) for v in value]
-        elif isinstance(value, tuple):
-            return tuple(self._sanitize_value(v) for v in value)
+            result = None
+            for k, v in value.items():
+                new = self._sanitize_value(v)
+                if new is not v:
+                    if result is None:
+                        result = dict(value)
+                    result[k] = new
+            return value if result is None else result
+        elif isinstance(value, list | tuple):
+            items = None
+            for i, v in enumerate(value):
+                new = self._sanitize_value(v)
+                if new is not v:
+                    if items is None:
+                        items = list(value)
+                    items[i] = new
+            if items is None:
+                return value
+            return items if isinstance(value, list) else tuple(items)
         else:
             return value
 
@@ -5,8 +5,12 @@ without modifying its core logic. They wrap the brick to add features
 like logging, API endpoints, CLI interfaces, etc.
 """
 
+import asyncio
+import copy
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar
+from collections.abc import Coroutine
+from typing import Any, ClassVar, Generic, TypeVar
 
 from nanobricks.protocol import NanobrickBase, NanobrickProtocol, T_deps, T_in, T_out
 
@@ -18,16 +22,19 @@ class Skill(ABC, Generic[T_in, T_out, T_deps]):
     modifying the brick's core behavior.
     """
 
+    #: Skill name, derived once per class from the class name
+    name: ClassVar[str] = ""
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "name" not in cls.__dict__:
+            cls.name = cls.__name__.replace("Skill", "").lower()
+
     def __init__(self, config: dict[str, Any] | None = None):
         """Initialize the skill with optional configuration."""
         self.config = config or {}
         self._wrapped: NanobrickProtocol[T_in, T_out, T_deps] | None = None
 
-    @property
-    def name(self) -> str:
-        """Return the skill name."""
-        return self.__class__.__name__.replace("Skill", "").lower()
-
     def enhance(
         self, brick: NanobrickProtocol[T_in, T_out, T_deps]
     ) -> NanobrickProtocol[T_in, T_out, T_deps]:
@@ -81,6 +88,42 @@ class NanobrickEnhanced(NanobrickBase[T_in, T_out, T_deps]):
         return f"{self.name} v{self.version}"
 
 
+_sync_loop: asyncio.AbstractEventLoop | None = None
+_sync_loop_lock = threading.Lock()
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion from synchronous code.
+
+    Coroutines are submitted to a single event loop that lives in a daemon
+    thread, started on first use, so repeated sync calls do not each pay for
+    creating and closing a fresh loop. Like ``NanobrickBase.invoke_sync``,
+    this refuses to run inside any running event loop: blocking that loop's
+    thread on the result would stall it, and the coroutine would run on a
+    different loop from the caller's.
+    """
+    global _sync_loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError(
+            "Cannot call invoke_sync from within an async context. "
+            "Use 'await invoke()' instead."
+        )
+    if _sync_loop is None:
+        with _sync_loop_lock:
+            if _sync_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="nanobricks-sync-loop", daemon=True
+                ).start()
+                _sync_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
 # Type for the registry
 T_Skill = TypeVar("T_Skill", bound=Skill)
 
@@ -120,11 +163,12 @@ class SkillRegistry:
         Raises:
             KeyError: If skill not found
         """
-        if name not in self._skills:
+        try:
+            return self._skills[name]
+        except KeyError:
             raise KeyError(
                 f"Skill '{name}' not found. Available: {list(self._skills.keys())}"
-            )
-        return self._skills[name]
+            ) from None
 
     def create(self, name: str, config: dict[str, Any] | None = None) -> Skill:
         """Create a skill instance.
@@ -187,6 +231,16 @@ def with_skill(
     return skill.enhance(brick)
 
 
+def _added_attribute_names(enhanced: Any) -> dict[str, None]:
+    """Collect attribute names an enhanced brick may add on top of a brick."""
+    names = dict.fromkeys(vars(enhanced))
+    for klass in type(enhanced).__mro__:
+        if klass in (NanobrickEnhanced, NanobrickBase, object):
+            break
+        names.update(dict.fromkeys(vars(klass)))
+    return names
+
+
 def skill(name: str | type[Skill], **config: Any):
     """Decorator to add a skill to a brick class.
 
@@ -211,20 +265,23 @@ def skill(name: str | type[Skill], **config: Any):
                 else:
                     sp = name(config)
 
-                # Create a temporary instance to get enhanced methods
-                temp_instance = type(self).__bases__[0](*args, **kwargs)
-                enhanced = sp.enhance(temp_instance)
+                # Enhance a shallow copy taken before our methods are replaced,
+                # so the skill wraps the undecorated behaviour without running
+                # __init__ a second time
+                enhanced = sp.enhance(copy.copy(self))
 
                 # Replace our methods with enhanced ones
                 self.invoke = enhanced.invoke
                 self.invoke_sync = enhanced.invoke_sync
                 self.name = enhanced.name
 
-                # Copy all methods from enhanced instance
-                for attr_name in dir(enhanced):
-                    if not attr_name.startswith("_"):
+                # Copy the methods the skill adds. Only names defined on the
+                # enhanced class (below the shared base classes) or on the
+                # instance can be new, so skip walking the full dir()
+                for attr_name in _added_attribute_names(enhanced):
+                    if not attr_name.startswith("_") and not hasattr(self, attr_name):
                         attr = getattr(enhanced, attr_name)
-                        if callable(attr) and not hasattr(self, attr_name):
+                        if callable(attr):
                             setattr(self, attr_name, attr)
 
         # Copy class metadata
@@ -1,24 +1,26 @@
 """A2A (Agent-to-Agent) skill for nanobricks."""
 
 import asyncio
+import time
 import uuid
+import weakref
+from collections import OrderedDict, deque
 from collections.abc import Callable
-from dataclasses import dataclass, field
-from datetime import datetime
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
 from typing import Any
 
 from nanobricks.agent.ai_protocol import (
     BaseAIProtocolAdapter,
     Message,
     ProtocolConfig,
-    ProtocolRegistry,
     ProtocolType,
 )
 from nanobricks.protocol import NanobrickBase
-from nanobricks.skill import NanobrickEnhanced, Skill
+from nanobricks.skill import NanobrickEnhanced, Skill, run_sync
 
 
-@dataclass
+@dataclass(slots=True)
 class A2AMessage:
     """Agent-to-agent message."""
 
@@ -26,12 +28,24 @@ class A2AMessage:
     content: Any
     reply_to: str | None = None
     conversation_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    id: str | None = None
+
+    @property
+    def timestamp(self) -> datetime:
+        """Creation time as a naive UTC datetime, decoded on demand."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, UTC).replace(tzinfo=None)
 
     def to_protocol_message(self) -> Message:
-        """Convert to protocol message."""
+        """Convert to protocol message.
+
+        A message ID is assigned on first conversion and kept, so converting
+        the same message again reuses it instead of drawing a new UUID.
+        """
+        if self.id is None:
+            self.id = str(uuid.uuid4())
         return Message(
-            id=str(uuid.uuid4()),
+            id=self.id,
             type="a2a_message",
             content={
                 "agent_id": self.agent_id,
@@ -39,18 +53,22 @@ class A2AMessage:
                 "reply_to": self.reply_to,
                 "conversation_id": self.conversation_id,
             },
-            metadata={"timestamp": self.timestamp.isoformat()},
+            metadata={"timestamp_ns": self.timestamp_ns},
         )
 
 
-class A2AProtocolAdapter(BaseAIProtocolAdapter):
+class A2AProtocolAdapter(BaseAIProtocolAdapter, protocol_type=ProtocolType.A2A):
     """A2A protocol adapter implementation."""
 
     def __init__(self, config: ProtocolConfig):
         """Initialize A2A adapter."""
         super().__init__(config)
         self._message_queue: asyncio.Queue = asyncio.Queue()
-        self._agents: dict[str, SkillA2A] = {}
+        # Weak values: a skill that is dropped without unregistering
+        # disappears from the adapter instead of being kept alive by it
+        self._agents: weakref.WeakValueDictionary[str, SkillA2A] = (
+            weakref.WeakValueDictionary()
+        )
         self._running = False
         self._task: asyncio.Task | None = None
 
@@ -61,18 +79,30 @@ class A2AProtocolAdapter(BaseAIProtocolAdapter):
 
         # Extract agent ID from message
         agent_id = message.content.get("agent_id")
-        if agent_id and agent_id in self._agents:
-            agent = self._agents[agent_id]
-            # Convert back to A2A message
-            a2a_msg = A2AMessage(
-                agent_id=message.content["agent_id"],
-                content=message.content["content"],
-                reply_to=message.content.get("reply_to"),
-                conversation_id=message.content.get(
-                    "conversation_id", str(uuid.uuid4())
-                ),
-            )
-            await agent._receive_message(a2a_msg)
+        agent = self._agents.get(agent_id) if agent_id else None
+        if agent is not None:
+            await agent._receive_message(self._to_a2a_message(message))
+
+    @staticmethod
+    def _to_a2a_message(message: Message) -> A2AMessage:
+        """Convert a protocol message back to an A2A message."""
+        return A2AMessage(
+            agent_id=message.content["agent_id"],
+            content=message.content["content"],
+            reply_to=message.content.get("reply_to"),
+            conversation_id=message.content.get("conversation_id", str(uuid.uuid4())),
+            timestamp_ns=message.metadata.get("timestamp_ns") or time.time_ns(),
+            id=message.id,
+        )
+
+    async def _send_local(self, message: A2AMessage) -> None:
+        """Deliver an A2A message to an in-process agent without conversion."""
+        if not self._connected:
+            raise RuntimeError("Not connected")
+
+        agent = self._agents.get(message.agent_id)
+        if agent is not None:
+            await agent._receive_message(message)
 
     async def receive(self) -> Message | None:
         """Receive message from queue."""
@@ -109,13 +139,18 @@ class A2AProtocolAdapter(BaseAIProtocolAdapter):
         self._agents.pop(agent_id, None)
 
     async def broadcast(self, message: Message) -> None:
-        """Broadcast message to all agents."""
-        for agent in self._agents.values():
-            await self.send(message)
+        """Broadcast message to all agents.
 
+        The message is converted once and the same A2A message is delivered
+        to every registered agent concurrently.
+        """
+        if not self._connected:
+            raise RuntimeError("Not connected")
 
-# Register A2A adapter
-ProtocolRegistry.register(ProtocolType.A2A, A2AProtocolAdapter)
+        a2a_msg = self._to_a2a_message(message)
+        await asyncio.gather(
+            *(agent._receive_message(a2a_msg) for agent in list(self._agents.values()))
+        )
 
 
 class SkillA2A(Skill):
@@ -127,76 +162,32 @@ class SkillA2A(Skill):
         adapter: A2AProtocolAdapter | None = None,
         auto_reply: bool = False,
         reply_handler: Callable[[A2AMessage], Any] | None = None,
+        max_history: int = 1000,
+        max_conversations: int = 1000,
     ):
-        """Initialize A2A skill."""
+        """Initialize A2A skill.
+
+        Each conversation keeps at most ``max_history`` messages, and only the
+        ``max_conversations`` most recently active conversations are kept.
+        """
         super().__init__()
         self.agent_id = agent_id or str(uuid.uuid4())
         self._adapter = adapter
-        self._message_handlers: list[Callable[[A2AMessage], None]] = []
-        self._conversations: dict[str, list[A2AMessage]] = {}
+        # Handlers are split by kind at registration
+        self._sync_handlers: list[Callable[[A2AMessage], Any]] = []
+        self._async_handlers: list[Callable[[A2AMessage], Any]] = []
+        self._pending_replies: dict[str, asyncio.Future] = {}
+        self._conversations: OrderedDict[str, deque[A2AMessage]] = OrderedDict()
+        self._max_history = max_history
+        self._max_conversations = max_conversations
         self._auto_reply = auto_reply
         self._reply_handler = reply_handler
         self._peers: set[str] = set()
+        self._broadcast_results = False
         self._connected = False
 
     def _create_enhanced_brick(self, brick: NanobrickBase) -> NanobrickEnhanced:
         """Create enhanced brick with A2A capabilities."""
-
-        class A2ANanobrickEnhanced(NanobrickEnhanced):
-            """Brick enhanced with A2A communication."""
-
-            def __init__(self, wrapped: NanobrickBase, skill: SkillA2A):
-                """Initialize enhanced brick."""
-                super().__init__(wrapped, skill)
-                self._a2a_skill = skill
-
-            async def invoke(self, input: Any, *, deps: dict | None = None) -> Any:
-                """Invoke with A2A capabilities."""
-                # Connect if not connected
-                if not self._a2a_skill._connected:
-                    await self._a2a_skill.connect()
-
-                # Process input
-                result = await self.wrapped.invoke(input, deps=deps)
-
-                # Broadcast result if configured
-                if (
-                    hasattr(self._a2a_skill, "_broadcast_results")
-                    and self._a2a_skill._broadcast_results
-                ):
-                    await self._a2a_skill.broadcast(
-                        {
-                            "type": "result",
-                            "brick": self.wrapped.name,
-                            "input": input,
-                            "result": result,
-                        }
-                    )
-
-                return result
-
-            def invoke_sync(self, input: Any, *, deps: dict | None = None) -> Any:
-                """Sync invoke."""
-                return asyncio.run(self.invoke(input, deps=deps))
-
-            async def send_to(self, agent_id: str, content: Any) -> None:
-                """Send message to specific agent."""
-                await self._a2a_skill.send_to(agent_id, content)
-
-            async def broadcast(self, content: Any) -> None:
-                """Broadcast to all peers."""
-                await self._a2a_skill.broadcast(content)
-
-            def on_message(self, handler: Callable[[A2AMessage], None]) -> None:
-                """Register message handler."""
-                self._a2a_skill.on_message(handler)
-
-            async def request_reply(
-                self, agent_id: str, content: Any, timeout: float = 30.0
-            ) -> Any | None:
-                """Send message and wait for reply."""
-                return await self._a2a_skill.request_reply(agent_id, content, timeout)
-
         return A2ANanobrickEnhanced(brick, self)
 
     async def connect(self, endpoint: str | None = None) -> None:
@@ -204,13 +195,12 @@ class SkillA2A(Skill):
         if self._connected:
             return
 
-        # Create adapter if not provided
+        # Create adapter if not provided; the A2A adapter class is known
+        # here, so skip the registry lookup
         if not self._adapter:
-            config = ProtocolConfig(
-                protocol_type=ProtocolType.A2A,
-                endpoint=endpoint,
+            self._adapter = A2AProtocolAdapter(
+                ProtocolConfig(protocol_type=ProtocolType.A2A, endpoint=endpoint)
             )
-            self._adapter = ProtocolRegistry.create(config)
 
         # Connect adapter
         await self._adapter.connect()
@@ -244,17 +234,25 @@ class SkillA2A(Skill):
         )
 
         # Store in conversation
-        if msg.conversation_id not in self._conversations:
-            self._conversations[msg.conversation_id] = []
-        self._conversations[msg.conversation_id].append(msg)
+        self._conversation(msg.conversation_id).append(msg)
 
-        # Send via adapter
-        await self._adapter.send(msg.to_protocol_message())
+        await self._deliver(msg)
 
     async def broadcast(self, content: Any) -> None:
-        """Broadcast message to all peers."""
-        for peer_id in self._peers:
-            await self.send_to(peer_id, content)
+        """Broadcast message to all peers.
+
+        One message is built and re-addressed per peer, and all peers are
+        sent to concurrently as a single conversation.
+        """
+        if not self._peers:
+            return
+
+        template = A2AMessage(agent_id=self.agent_id, content=content)
+        messages = [replace(template, agent_id=peer_id) for peer_id in self._peers]
+
+        self._conversation(template.conversation_id).extend(messages)
+
+        await asyncio.gather(*(self._deliver(msg) for msg in messages))
 
     async def request_reply(
         self, agent_id: str, content: Any, timeout: float = 30.0
@@ -263,23 +261,17 @@ class SkillA2A(Skill):
         # Create unique message ID
         msg_id = str(uuid.uuid4())
 
-        # Create reply future
-        reply_future = asyncio.Future()
-
-        # Register temporary handler
-        def reply_handler(msg: A2AMessage):
-            if msg.reply_to == msg_id:
-                reply_future.set_result(msg.content)
-
-        self.on_message(reply_handler)
+        # Register reply future, resolved by _receive_message
+        reply_future = asyncio.get_running_loop().create_future()
+        self._pending_replies[msg_id] = reply_future
 
         # Send message
         msg = A2AMessage(
             agent_id=agent_id,
             content=content,
+            id=msg_id,
         )
-        msg.id = msg_id  # Override ID
-        await self._adapter.send(msg.to_protocol_message())
+        await self._deliver(msg)
 
         try:
             # Wait for reply
@@ -287,30 +279,55 @@ class SkillA2A(Skill):
         except TimeoutError:
             return None
         finally:
-            # Remove handler
-            self._message_handlers.remove(reply_handler)
+            self._pending_replies.pop(msg_id, None)
+
+    async def _deliver(self, msg: A2AMessage) -> None:
+        """Send a message, handing it over directly to in-process agents.
+
+        Only targets outside the local adapter go through the protocol
+        message conversion.
+        """
+        adapter = self._adapter
+        if isinstance(adapter, A2AProtocolAdapter) and msg.agent_id in adapter._agents:
+            await adapter._send_local(msg)
+        else:
+            await adapter.send(msg.to_protocol_message())
 
     def on_message(self, handler: Callable[[A2AMessage], None]) -> None:
-        """Register message handler."""
-        self._message_handlers.append(handler)
+        """Register message handler.
+
+        Sync handlers are called in registration order; async handlers then
+        run concurrently. Errors raised by handlers are ignored.
+        """
+        if asyncio.iscoroutinefunction(handler):
+            self._async_handlers.append(handler)
+        else:
+            self._sync_handlers.append(handler)
 
     async def _receive_message(self, message: A2AMessage) -> None:
         """Internal message receiver."""
         # Store in conversation
-        if message.conversation_id not in self._conversations:
-            self._conversations[message.conversation_id] = []
-        self._conversations[message.conversation_id].append(message)
-
-        # Call handlers
-        for handler in self._message_handlers:
+        self._conversation(message.conversation_id).append(message)
+
+        # Replies to an outstanding request_reply go straight to its future
+        if message.reply_to is not None:
+            reply_future = self._pending_replies.pop(message.reply_to, None)
+            if reply_future is not None:
+                if not reply_future.done():
+                    reply_future.set_result(message.content)
+                return
+
+        # Call handlers, ignoring handler errors
+        for handler in self._sync_handlers:
             try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(message)
-                else:
-                    handler(message)
+                handler(message)
             except Exception:
-                # Ignore handler errors
                 pass
+        if self._async_handlers:
+            await asyncio.gather(
+                *(handler(message) for handler in self._async_handlers),
+                return_exceptions=True,
+            )
 
         # Auto-reply if configured
         if self._auto_reply and self._reply_handler and not message.reply_to:
@@ -323,10 +340,10 @@ class SkillA2A(Skill):
                     reply_msg = A2AMessage(
                         agent_id=message.agent_id,
                         content=reply_content,
-                        reply_to=getattr(message, "id", None),
+                        reply_to=message.id,
                         conversation_id=message.conversation_id,
                     )
-                    await self._adapter.send(reply_msg.to_protocol_message())
+                    await self._deliver(reply_msg)
             except Exception:
                 # Ignore auto-reply errors
                 pass
@@ -339,6 +356,76 @@ class SkillA2A(Skill):
         """Remove a peer agent."""
         self._peers.discard(agent_id)
 
+    def _conversation(self, conversation_id: str) -> deque[A2AMessage]:
+        """Return the history of a conversation, marking it most recent.
+
+        Starting a new conversation evicts the least recently active one once
+        ``max_conversations`` is exceeded.
+        """
+        conversations = self._conversations
+        history = conversations.get(conversation_id)
+        if history is None:
+            history = conversations[conversation_id] = deque(maxlen=self._max_history)
+            if len(conversations) > self._max_conversations:
+                conversations.popitem(last=False)
+        else:
+            conversations.move_to_end(conversation_id)
+        return history
+
     def get_conversation(self, conversation_id: str) -> list[A2AMessage]:
         """Get conversation history."""
-        return self._conversations.get(conversation_id, [])
+        history = self._conversations.get(conversation_id)
+        return list(history) if history is not None else []
+
+
+class A2ANanobrickEnhanced(NanobrickEnhanced):
+    """Brick enhanced with A2A communication."""
+
+    def __init__(self, wrapped: NanobrickBase, skill: SkillA2A):
+        """Initialize enhanced brick."""
+        super().__init__(wrapped, skill)
+        self._a2a_skill = skill
+
+    async def invoke(self, input: Any, *, deps: dict | None = None) -> Any:
+        """Invoke with A2A capabilities."""
+        # Connect if not connected
+        if not self._a2a_skill._connected:
+            await self._a2a_skill.connect()
+
+        # Process input
+        result = await self._wrapped.invoke(input, deps=deps)
+
+        # Broadcast result if configured
+        if self._a2a_skill._broadcast_results:
+            await self._a2a_skill.broadcast(
+                {
+                    "type": "result",
+                    "brick": self._wrapped.name,
+                    "input": input,
+                    "result": result,
+                }
+            )
+
+        return result
+
+    def invoke_sync(self, input: Any, *, deps: dict | None = None) -> Any:
+        """Sync invoke."""
+        return run_sync(self.invoke(input, deps=deps))
+
+    async def send_to(self, agent_id: str, content: Any) -> None:
+        """Send message to specific agent."""
+        await self._a2a_skill.send_to(agent_id, content)
+
+    async def broadcast(self, content: Any) -> None:
+        """Broadcast to all peers."""
+        await self._a2a_skill.broadcast(content)
+
+    def on_message(self, handler: Callable[[A2AMessage], None]) -> None:
+        """Register message handler."""
+        self._a2a_skill.on_message(handler)
+
+    async def request_reply(
+        self, agent_id: str, content: Any, timeout: float = 30.0
+    ) -> Any | None:
+        """Send message and wait for reply."""
+        return await self._a2a_skill.request_reply(agent_id, content, timeout)
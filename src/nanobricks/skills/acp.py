@@ -1,11 +1,14 @@
 """ACP (Agent Communication Protocol) skill for REST-based AI compatibility."""
 
 import asyncio
-import uuid
-from collections.abc import Callable
+import json
+import random
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any
+from datetime import UTC, datetime
+from typing import Any, cast
 from urllib.parse import urljoin
 
 import aiohttp
@@ -16,12 +19,28 @@ from nanobricks.agent.ai_protocol import (
     ProtocolConfig,
     ProtocolRegistry,
     ProtocolType,
+    next_id,
 )
 from nanobricks.protocol import NanobrickBase
-from nanobricks.skill import NanobrickEnhanced, Skill
+from nanobricks.skill import NanobrickEnhanced, Skill, run_sync
 
+# Use orjson for request and response bodies if available
+try:
+    import orjson
 
-@dataclass
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_serialize(obj: Any) -> str:
+    """Serialize a request body, matching ``json.dumps`` on non-str keys."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+@dataclass(slots=True, frozen=True)
 class RESTEndpoint:
     """REST endpoint configuration."""
 
@@ -36,14 +55,19 @@ class RESTEndpoint:
         return urljoin(base_url, self.path)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RESTResponse:
     """REST response wrapper."""
 
     status: int
     data: Any
     headers: dict[str, str]
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp_ns: int = field(default_factory=time.time_ns)
+
+    @property
+    def timestamp(self) -> datetime:
+        """Creation time as a naive UTC datetime, decoded on demand."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, UTC).replace(tzinfo=None)
 
     @property
     def is_success(self) -> bool:
@@ -60,17 +84,126 @@ class RESTResponse:
         }
 
 
-class ACPProtocolAdapter(BaseAIProtocolAdapter):
-    """ACP protocol adapter for REST-based communication."""
+@dataclass(slots=True)
+class _PreparedEndpoint:
+    """An endpoint with its request values resolved against the base URL."""
+
+    endpoint: RESTEndpoint
+    url: str
+    # Constant headers for every request to this endpoint
+    headers: dict[str, str]
+    timeout: aiohttp.ClientTimeout
+
+
+# Connection pool settings for the shared client sessions
+_POOL_LIMIT = 200
+_POOL_LIMIT_PER_HOST = 32
+_KEEPALIVE_TIMEOUT = 75.0
+_DNS_CACHE_TTL = 300
+_HEALTH_CHECK_TIMEOUT = aiohttp.ClientTimeout(total=5.0)
+
+# Chunk size for streamed response bodies
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Responses to plain send() calls kept for receive(), oldest dropped first
+_RESPONSE_QUEUE_SIZE = 1024
+
+# Retry policy for SkillACP calls
+_MAX_RETRY_DELAY = 30.0
+_MAX_CONCURRENT_RETRIES = 8
+# Client error statuses that are worth retrying; all 5xx are retried too
+_RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
+
+
+@dataclass(slots=True, weakref_slot=True)
+class _SharedSession:
+    """A pooled session and the number of adapters currently using it."""
+
+    session: aiohttp.ClientSession
+    refs: int = 0
 
-    def __init__(self, config: ProtocolConfig):
+
+# Shared sessions keyed by (event loop id, default headers). Entries are held
+# weakly and kept alive by the adapters using them, so an adapter that is
+# never disconnected does not pin its session and event loop for the life of
+# the process. The session references its loop, so the loop id cannot be
+# reused while an entry exists.
+_shared_sessions: weakref.WeakValueDictionary[tuple[Any, ...], _SharedSession] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _acquire_session(default_headers: dict[str, str]) -> _SharedSession:
+    """Get or create the pooled session for these headers on the running loop.
+
+    Pass the returned entry to ``_release_session`` when done.
+    """
+    key = (id(asyncio.get_running_loop()), tuple(sorted(default_headers.items())))
+    entry = _shared_sessions.get(key)
+    if entry is None or entry.session.closed:
+        entry = _SharedSession(
+            aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=_POOL_LIMIT,
+                    limit_per_host=_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=_DNS_CACHE_TTL,
+                ),
+                headers=default_headers,
+                json_serialize=_json_serialize,
+            )
+        )
+        _shared_sessions[key] = entry
+    entry.refs += 1
+    return entry
+
+
+async def _release_session(entry: _SharedSession) -> None:
+    """Drop one reference to a shared session, closing it with the last one."""
+    entry.refs -= 1
+    if entry.refs <= 0:
+        await entry.session.close()
+
+
+async def _iter_body(response: aiohttp.ClientResponse) -> AsyncIterator[bytes]:
+    """Yield a response body in chunks, releasing the connection at the end."""
+    try:
+        async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        response.release()
+
+
+class ACPProtocolAdapter(BaseAIProtocolAdapter, protocol_type=ProtocolType.ACP):
+    """ACP protocol adapter for REST-based communication.
+
+    Adapters with the same credentials share one pooled, keep-alive
+    ``aiohttp`` session per event loop, so connecting another adapter does
+    not open new connections. A session passed in explicitly is used as is
+    and left open on disconnect.
+    """
+
+    def __init__(
+        self, config: ProtocolConfig, session: aiohttp.ClientSession | None = None
+    ):
         """Initialize ACP adapter."""
         super().__init__(config)
-        self._session: aiohttp.ClientSession | None = None
+        self._session: aiohttp.ClientSession | None = session
+        self._shared_session: _SharedSession | None = None
         self._base_url = config.endpoint or "http://localhost:8000"
         self._auth_headers = self._build_auth_headers(config.auth)
-        self._endpoints: dict[str, RESTEndpoint] = {}
-        self._response_queue: asyncio.Queue = asyncio.Queue()
+        # Sent with every request: shared sessions carry them as session
+        # defaults, an injected session gets them per request
+        self._default_headers = {
+            **self._auth_headers,
+            "Content-Type": "application/json",
+        }
+        self._request_headers = self._default_headers if session else {}
+        self._endpoints: dict[str, _PreparedEndpoint] = {}
+        self._default_endpoint = self._prepare(RESTEndpoint(path="/agent/message"))
+        self._response_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=_RESPONSE_QUEUE_SIZE
+        )
 
     def _build_auth_headers(self, auth: dict[str, str] | None) -> dict[str, str]:
         """Build authentication headers."""
@@ -96,70 +229,115 @@ class ACPProtocolAdapter(BaseAIProtocolAdapter):
         return {}
 
     async def send(self, message: Message) -> None:
-        """Send message via REST."""
+        """Send message via REST, queueing its response for ``receive``.
+
+        If nobody is receiving and the queue is full, the oldest queued
+        response is dropped to make room.
+        """
+        response = await self.send_and_wait(message)
+        queue = self._response_queue
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(response)
+
+    async def send_and_wait(self, message: Message) -> Message:
+        """Send message via REST and return its response.
+
+        The request runs in the caller's task, so the response is handed
+        straight back rather than through the shared receive queue, and
+        concurrent callers each get their own response.
+
+        Returns:
+            A ``rest_response`` message, or an ``error`` message if the
+            request failed
+        """
+        if not self._connected:
+            raise RuntimeError("Not connected")
+
+        try:
+            rest_response = await self.request(message)
+        except TimeoutError:
+            return Message(
+                id=next_id(),
+                type="error",
+                content={"error": "Request timeout", "message_id": message.id},
+                metadata={"original_message_id": message.id},
+            )
+        except Exception as e:
+            return Message(
+                id=next_id(),
+                type="error",
+                content={"error": str(e), "message_id": message.id},
+                metadata={"original_message_id": message.id},
+            )
+
+        return Message(
+            id=next_id(),
+            type="rest_response",
+            content=rest_response.to_dict(),
+            metadata={"original_message_id": message.id},
+        )
+
+    async def request(self, message: Message) -> RESTResponse:
+        """Send message via REST and return the raw response.
+
+        Unlike ``send_and_wait`` the response is not wrapped in a protocol
+        message, and request errors propagate to the caller.
+        """
         if not self._connected:
             raise RuntimeError("Not connected")
 
         # Determine endpoint
         endpoint_name = message.metadata.get("endpoint", "default")
-        endpoint = self._endpoints.get(
-            endpoint_name, RESTEndpoint(path="/agent/message")
-        )
+        prepared = self._endpoints.get(endpoint_name, self._default_endpoint)
+        endpoint = prepared.endpoint
 
         # Prepare request
-        url = endpoint.full_url(self._base_url)
+        url = prepared.url
         headers = {
-            **self._auth_headers,
-            **endpoint.headers,
-            "Content-Type": "application/json",
+            **prepared.headers,
             "X-Message-ID": message.id,
             "X-Message-Type": message.type,
         }
 
         # Send request
-        try:
-            async with self._session.request(
-                endpoint.method,
-                url,
-                json=message.to_dict(),
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=endpoint.timeout),
-            ) as response:
-                data = (
-                    await response.json()
-                    if response.content_type == "application/json"
-                    else await response.text()
-                )
-
-                rest_response = RESTResponse(
-                    status=response.status, data=data, headers=dict(response.headers)
-                )
-
-                # Queue response for receive
-                response_msg = Message(
-                    id=str(uuid.uuid4()),
-                    type="rest_response",
-                    content=rest_response.to_dict(),
-                    metadata={"original_message_id": message.id},
-                )
-                await self._response_queue.put(response_msg)
-
-        except TimeoutError:
-            error_msg = Message(
-                id=str(uuid.uuid4()),
-                type="error",
-                content={"error": "Request timeout", "message_id": message.id},
-                metadata={"original_message_id": message.id},
+        response = await self._session.request(
+            endpoint.method,
+            url,
+            json=message.to_dict(),
+            headers=headers,
+            timeout=prepared.timeout,
+        )
+        # Error bodies are always buffered, so a retried response is released
+        if response.ok and message.metadata.get("stream_response"):
+            return RESTResponse(
+                status=response.status,
+                data=_iter_body(response),
+                headers=dict(response.headers),
             )
-            await self._response_queue.put(error_msg)
-        except Exception as e:
-            error_msg = Message(
-                id=str(uuid.uuid4()),
-                type="error",
-                content={"error": str(e), "message_id": message.id},
-                metadata={"original_message_id": message.id},
+
+        async with response:
+            # Only read and decode bodies that exist and are wanted
+            if (
+                response.status == 204
+                or response.content_length == 0
+                or message.metadata.get("discard_response")
+            ):
+                data = None
+            elif response.content_type == "application/json":
+                if HAS_ORJSON:
+                    body = await response.read()
+                    # Like response.json(), an empty body (e.g. chunked with
+                    # no Content-Length) decodes to None
+                    data = orjson.loads(body) if body.strip() else None
+                else:
+                    data = await response.json()
+            else:
+                data = await response.text()
+
+            return RESTResponse(
+                status=response.status, data=data, headers=dict(response.headers)
             )
-            await self._response_queue.put(error_msg)
 
     async def receive(self) -> Message | None:
         """Receive message from queue."""
@@ -174,41 +352,162 @@ class ACPProtocolAdapter(BaseAIProtocolAdapter):
     async def connect(self) -> None:
         """Connect to REST service."""
         if not self._session:
-            self._session = aiohttp.ClientSession()
+            self._shared_session = _acquire_session(self._default_headers)
+            self._session = self._shared_session.session
         self._connected = True
 
-        # Test connection with health check
+    async def ensure_ready(self) -> None:
+        """Probe the service's health endpoint.
+
+        ``connect`` does not probe the service; the first real request doubles
+        as the liveness check. Call this when an explicit check is wanted.
+
+        Raises:
+            ConnectionError: If the service is unreachable or unhealthy
+        """
+        if not self._session:
+            raise RuntimeError("Not connected")
+        health_endpoint = self._endpoints.get("health") or self._prepare(
+            RESTEndpoint(path="/health")
+        )
         try:
-            health_endpoint = self._endpoints.get(
-                "health", RESTEndpoint(path="/health")
-            )
-            url = health_endpoint.full_url(self._base_url)
             async with self._session.get(
-                url, timeout=aiohttp.ClientTimeout(total=5.0)
+                health_endpoint.url, timeout=_HEALTH_CHECK_TIMEOUT
             ) as response:
-                if response.status != 200:
-                    print(f"Warning: Health check returned {response.status}")
-        except Exception as e:
-            print(f"Warning: Health check failed: {e}")
+                status = response.status
+        except (aiohttp.ClientError, TimeoutError) as e:
+            raise ConnectionError(f"Health check failed: {e}") from e
+        if status != 200:
+            raise ConnectionError(f"Health check returned {status}")
 
     async def disconnect(self) -> None:
         """Disconnect from REST service."""
         self._connected = False
-        if self._session:
-            await self._session.close()
+        if self._shared_session is not None:
+            entry, self._shared_session = self._shared_session, None
             self._session = None
+            await _release_session(entry)
+
+    def _prepare(self, endpoint: RESTEndpoint) -> _PreparedEndpoint:
+        """Resolve the per-request values of an endpoint once."""
+        return _PreparedEndpoint(
+            endpoint=endpoint,
+            url=endpoint.full_url(self._base_url),
+            headers={**self._request_headers, **endpoint.headers},
+            timeout=aiohttp.ClientTimeout(total=endpoint.timeout),
+        )
 
     def register_endpoint(self, name: str, endpoint: RESTEndpoint) -> None:
         """Register a REST endpoint."""
-        self._endpoints[name] = endpoint
+        self._endpoints[name] = self._prepare(endpoint)
 
     def get_endpoint(self, name: str) -> RESTEndpoint | None:
         """Get registered endpoint."""
-        return self._endpoints.get(name)
+        prepared = self._endpoints.get(name)
+        return prepared.endpoint if prepared else None
+
+
+class _BatchCoalescer:
+    """Coalesces concurrent calls to one endpoint into a single request.
+
+    Calls arriving within ``max_delay`` seconds of each other, up to
+    ``max_batch`` of them, are sent as one message whose content is
+    ``{"batch": [<message dict>, ...]}``. The server is expected to answer
+    with ``{"batch": [<result>, ...]}`` in the same order. Each caller gets a
+    ``RESTResponse`` carrying its own result and the shared status/headers.
+    """
+
+    def __init__(
+        self,
+        skill: "SkillACP",
+        endpoint: str,
+        method: str,
+        max_batch: int = 64,
+        max_delay: float = 0.005,
+    ):
+        self._skill = skill
+        self._endpoint = endpoint
+        self._method = method
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: list[tuple[Message, asyncio.Future[RESTResponse]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, message: Message) -> RESTResponse:
+        """Queue a message for the next batch and wait for its response."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[RESTResponse] = loop.create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.create_task(self._send(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self, items: list[tuple[Message, asyncio.Future[RESTResponse]]]
+    ) -> None:
+        """Send one batch and fan the results back out to the callers."""
+        message = Message(
+            id=next_id(),
+            type="api_call_batch",
+            content={"batch": [item.to_dict() for item, _ in items]},
+            metadata={"endpoint": self._endpoint, "method": self._method},
+        )
+        try:
+            response = await self._skill._send_with_retry(message)
+            results = (
+                response.data.get("batch") if isinstance(response.data, dict) else None
+            )
+            if not isinstance(results, list) or len(results) != len(items):
+                raise ValueError(
+                    f"Expected {len(items)} batch results from {self._endpoint}"
+                )
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results, strict=True):
+            if not future.done():
+                future.set_result(
+                    RESTResponse(
+                        status=response.status, data=result, headers=response.headers
+                    )
+                )
+
+
+def _is_client_error(status: int) -> bool:
+    """Check for a 4xx status that retrying will not fix."""
+    return 400 <= status < 500 and status not in _RETRYABLE_CLIENT_STATUSES
+
+
+def _compose_interceptors(
+    interceptors: tuple[Callable[[Message], Message], ...],
+) -> Callable[[Message], Message]:
+    """Compose interceptors into one callable, applied in order."""
+    if len(interceptors) == 1:
+        return interceptors[0]
 
+    def intercept(message: Message) -> Message:
+        for interceptor in interceptors:
+            message = interceptor(message)
+        return message
 
-# Register ACP adapter
-ProtocolRegistry.register(ProtocolType.ACP, ACPProtocolAdapter)
+    return intercept
 
 
 class SkillACP(Skill):
@@ -221,16 +520,27 @@ class SkillACP(Skill):
         adapter: ACPProtocolAdapter | None = None,
         retry_count: int = 3,
         retry_delay: float = 1.0,
+        strict_health_check: bool = False,
     ):
         """Initialize ACP skill."""
         super().__init__()
         self._base_url = base_url
+        self._strict_health_check = strict_health_check
         self._auth = auth
         self._adapter = adapter
         self._retry_count = retry_count
         self._retry_delay = retry_delay
         self._interceptors: list[Callable[[Message], Message]] = []
-        self._response_handlers: dict[str, Callable[[RESTResponse], Any]] = {}
+        # All interceptors composed into one callable, None when there are none
+        self._intercept: Callable[[Message], Message] | None = None
+        # message type -> (handler, is_coroutine_function)
+        self._response_handlers: dict[
+            str, tuple[Callable[[RESTResponse], Any], bool]
+        ] = {}
+        self._coalescers: dict[tuple[str, str], _BatchCoalescer] = {}
+        self._retry_slots: dict[str, asyncio.Semaphore] = {}
+        self._auto_sync = False
+        self._connected = False
 
     def _create_enhanced_brick(self, brick: NanobrickBase) -> NanobrickEnhanced:
         """Create enhanced brick with ACP capabilities."""
@@ -246,27 +556,21 @@ class SkillACP(Skill):
             async def invoke(self, input: Any, *, deps: dict | None = None) -> Any:
                 """Invoke with ACP capabilities."""
                 # Connect if not connected
-                if (
-                    not self._acp_skill._adapter
-                    or not self._acp_skill._adapter.is_connected()
-                ):
+                if not self._acp_skill._connected:
                     await self._acp_skill.connect()
 
                 # Process input
-                result = await self.wrapped.invoke(input, deps=deps)
+                result = await self._wrapped.invoke(input, deps=deps)
 
                 # Send result to API if configured
-                if (
-                    hasattr(self._acp_skill, "_auto_sync")
-                    and self._acp_skill._auto_sync
-                ):
+                if self._acp_skill._auto_sync:
                     await self._acp_skill.sync_result(result)
 
                 return result
 
             def invoke_sync(self, input: Any, *, deps: dict | None = None) -> Any:
                 """Sync invoke."""
-                return asyncio.run(self.invoke(input, deps=deps))
+                return run_sync(self.invoke(input, deps=deps))
 
             async def call_api(
                 self,
@@ -274,9 +578,20 @@ class SkillACP(Skill):
                 data: Any,
                 method: str = "POST",
                 headers: dict[str, str] | None = None,
+                batch: bool = False,
+                discard_response: bool = False,
+                stream_response: bool = False,
             ) -> RESTResponse:
                 """Call REST API endpoint."""
-                return await self._acp_skill.call_api(endpoint, data, method, headers)
+                return await self._acp_skill.call_api(
+                    endpoint,
+                    data,
+                    method,
+                    headers,
+                    batch,
+                    discard_response,
+                    stream_response,
+                )
 
             def register_endpoint(self, name: str, endpoint: RESTEndpoint) -> None:
                 """Register API endpoint."""
@@ -312,13 +627,21 @@ class SkillACP(Skill):
                 auth=self._auth,
                 retry_count=self._retry_count,
             )
-            self._adapter = ProtocolRegistry.create(config)
+            self._adapter = cast(ACPProtocolAdapter, ProtocolRegistry.create(config))
 
         # Connect adapter
         await self._adapter.connect()
+        if self._strict_health_check:
+            try:
+                await self._adapter.ensure_ready()
+            except ConnectionError:
+                await self._adapter.disconnect()
+                raise
+        self._connected = True
 
     async def disconnect(self) -> None:
         """Disconnect from REST API."""
+        self._connected = False
         if self._adapter:
             await self._adapter.disconnect()
 
@@ -328,52 +651,110 @@ class SkillACP(Skill):
         data: Any,
         method: str = "POST",
         headers: dict[str, str] | None = None,
+        batch: bool = False,
+        discard_response: bool = False,
+        stream_response: bool = False,
     ) -> RESTResponse:
-        """Call REST API endpoint."""
+        """Call REST API endpoint.
+
+        With ``batch=True``, concurrent calls to the same endpoint and method
+        are coalesced into one request (see ``_BatchCoalescer``). Only use it
+        for idempotent calls against servers that accept batched payloads.
+        With ``discard_response=True`` the response body is not read and the
+        returned response has ``data=None``. With ``stream_response=True``
+        the body is not buffered: ``data`` is an async iterator of ``bytes``
+        chunks, which must be consumed to release the connection.
+        """
         # Create message
+        metadata: dict[str, Any] = {
+            "endpoint": endpoint,
+            "method": method,
+            "headers": headers or {},
+        }
+        if discard_response:
+            metadata["discard_response"] = True
+        if stream_response:
+            metadata["stream_response"] = True
         message = Message(
-            id=str(uuid.uuid4()),
+            id=next_id(),
             type="api_call",
             content=data,
-            metadata={"endpoint": endpoint, "method": method, "headers": headers or {}},
+            metadata=metadata,
         )
 
         # Apply interceptors
-        for interceptor in self._interceptors:
-            message = interceptor(message)
-
-        # Send with retry
-        last_error = None
+        if self._intercept is not None:
+            message = self._intercept(message)
+
+        if batch:
+            key = (endpoint, method)
+            coalescer = self._coalescers.get(key)
+            if coalescer is None:
+                coalescer = self._coalescers[key] = _BatchCoalescer(
+                    self, endpoint, method
+                )
+            response = await coalescer.submit(message)
+        else:
+            response = await self._send_with_retry(message)
+
+        # Call handlers
+        registered = self._response_handlers.get(message.type)
+        if registered is not None:
+            handler, is_async = registered
+            if is_async:
+                await handler(response)
+            else:
+                handler(response)
+
+        return response
+
+    async def _send_with_retry(self, message: Message) -> RESTResponse:
+        """Send a message, retrying failures, and return its response.
+
+        Errors and responses with a 5xx, 408 or 429 status are retried with
+        exponential backoff and jitter; other responses, successful or not,
+        are returned at once. A ``ClientResponseError`` raised for any other
+        client error is re-raised at once. At most
+        ``_MAX_CONCURRENT_RETRIES`` retries per endpoint are in flight at a
+        time. Once retries run out, the last response is returned, or the
+        last error raised.
+        """
+        adapter = self._adapter
+        if adapter is None:
+            raise RuntimeError("Not connected")
+        endpoint = message.metadata.get("endpoint", "default")
+        last_error: Exception | None = None
+        response: RESTResponse | None = None
         for attempt in range(self._retry_count):
             try:
-                await self._adapter.send(message)
-
-                # Wait for response
-                response_msg = await self._adapter.receive()
-                if response_msg and response_msg.type == "rest_response":
-                    response = RESTResponse(
-                        status=response_msg.content["status"],
-                        data=response_msg.content["data"],
-                        headers=response_msg.content["headers"],
-                    )
-
-                    # Call handlers
-                    if message.type in self._response_handlers:
-                        handler = self._response_handlers[message.type]
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(response)
-                        else:
-                            handler(response)
-
-                    return response
-                elif response_msg and response_msg.type == "error":
-                    raise Exception(response_msg.content["error"])
-
+                if attempt == 0:
+                    response = await adapter.request(message)
+                else:
+                    slots = self._retry_slots.get(endpoint)
+                    if slots is None:
+                        slots = self._retry_slots[endpoint] = asyncio.Semaphore(
+                            _MAX_CONCURRENT_RETRIES
+                        )
+                    async with slots:
+                        response = await adapter.request(message)
+            except aiohttp.ClientResponseError as e:
+                if _is_client_error(e.status):
+                    raise
+                last_error, response = e, None
             except Exception as e:
-                last_error = e
-                if attempt < self._retry_count - 1:
-                    await asyncio.sleep(self._retry_delay * (attempt + 1))
+                last_error, response = e, None
+            else:
+                if not (
+                    response.status >= 500
+                    or response.status in _RETRYABLE_CLIENT_STATUSES
+                ):
+                    return response
+            if attempt < self._retry_count - 1:
+                delay = min(self._retry_delay * 2**attempt, _MAX_RETRY_DELAY)
+                await asyncio.sleep(delay * (0.5 + random.random() / 2))
 
+        if response is not None:
+            return response
         raise last_error or Exception("Failed to get response")
 
     def register_endpoint(self, name: str, endpoint: RESTEndpoint) -> None:
@@ -384,48 +765,69 @@ class SkillACP(Skill):
     def add_interceptor(self, interceptor: Callable[[Message], Message]) -> None:
         """Add message interceptor."""
         self._interceptors.append(interceptor)
+        self._intercept = _compose_interceptors(tuple(self._interceptors))
 
     def on_response(
         self, message_type: str, handler: Callable[[RESTResponse], Any]
     ) -> None:
         """Register response handler."""
-        self._response_handlers[message_type] = handler
+        self._response_handlers[message_type] = (
+            handler,
+            asyncio.iscoroutinefunction(handler),
+        )
 
     async def sync_result(self, result: Any) -> None:
         """Sync result to API."""
         await self.call_api(
-            "sync", {"result": result, "timestamp": datetime.utcnow().isoformat()}
+            "sync",
+            {"result": result, "timestamp": datetime.utcnow().isoformat()},
+            discard_response=True,
         )
 
     async def stream_to_api(
         self, endpoint: str, data_stream: asyncio.Queue, batch_size: int = 10
     ) -> None:
-        """Stream data to API in batches."""
-        batch = []
-
+        """Stream data to API in batches.
+
+        Each batch waits for its first item, then takes whatever else is
+        already queued, up to ``batch_size``. The stream ends at a ``None``
+        item or after a second without data.
+        """
+        batch: list[Any] = []
+        ended = False
         while True:
-            try:
-                # Collect batch
-                while len(batch) < batch_size:
-                    try:
-                        item = await asyncio.wait_for(data_stream.get(), timeout=1.0)
-                        if item is None:  # End of stream
-                            break
-                        batch.append(item)
-                    except TimeoutError:
-                        break
-
-                # Send batch if not empty
-                if batch:
-                    await self.call_api(endpoint, {"batch": batch, "count": len(batch)})
-                    batch = []
-
-                # Check if stream ended
-                if data_stream.empty():
-                    await asyncio.sleep(0.1)
-                    if data_stream.empty():  # Double check
-                        break
-
-            except Exception:
-                # Continue on errors
-                await asyncio.sleep(1.0)
+            if not batch and not ended:
+                try:
+                    item = await asyncio.wait_for(data_stream.get(), timeout=1.0)
+                except TimeoutError:
+                    item = None
+                if item is None:  # End of stream
+                    ended = True
+                else:
+                    batch.append(item)
+
+            while not ended and len(batch) < batch_size:
+                try:
+                    item = data_stream.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    ended = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                try:
+                    await self.call_api(
+                        endpoint,
+                        {"batch": batch, "count": len(batch)},
+                        discard_response=True,
+                    )
+                except Exception:
+                    # Continue on errors, retrying the batch
+                    await asyncio.sleep(1.0)
+                    continue
+                batch = []
+
+            if ended:
+                break
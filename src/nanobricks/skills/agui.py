@@ -1,6 +1,7 @@
 """AGUI (Agent GUI) skill for interactive AI interfaces."""
 
 import asyncio
+import json
 import uuid
 from collections.abc import Callable
 from dataclasses import dataclass, field
@@ -13,10 +14,34 @@ from nanobricks.agent.ai_protocol import (
     ProtocolConfig,
     ProtocolRegistry,
     ProtocolType,
+    next_id,
 )
 from nanobricks.protocol import NanobrickBase
 from nanobricks.skill import NanobrickEnhanced, Skill
 
+# Use orjson for component serialization if available
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _fast_id(kind: str) -> str:
+    """Return a new process-unique ID for a component of the given kind."""
+    return f"{kind}_{next_id()}"
+
+
+# UI updates queued within this many seconds are sent as one message
+_FLUSH_DELAY = 0.005
+# Pending components plus values that trigger an immediate flush
+_MAX_PENDING_UPDATES = 128
+# Most UI events dispatched per wake-up of the event handler
+_EVENT_BATCH_SIZE = 64
+# Queued UI events before emit_event waits for the consumer
+_EVENT_QUEUE_SIZE = 8192
+
 
 class ComponentType(Enum):
     """UI component types."""
@@ -38,7 +63,11 @@ class ComponentType(Enum):
     DIALOG = "dialog"
 
 
-@dataclass
+# Value -> member, skipping EnumType.__call__ when parsing components
+_COMPONENT_TYPES = {member.value: member for member in ComponentType}
+
+
+@dataclass(slots=True)
 class UIComponent:
     """UI component definition."""
 
@@ -49,17 +78,41 @@ class UIComponent:
     handlers: dict[str, str] = field(default_factory=dict)  # event -> handler_id
 
     def to_dict(self) -> dict:
-        """Convert to dictionary."""
+        """Convert to dictionary.
+
+        Walks the tree with an explicit stack, so deep trees cost no Python
+        frame per node and cannot hit the recursion limit.
+        """
+        root = self._shallow_dict()
+        stack = [(self, root["children"])]
+        while stack:
+            comp, children = stack.pop()
+            for child in comp.children:
+                child_dict = child._shallow_dict()
+                children.append(child_dict)
+                if child.children:
+                    stack.append((child, child_dict["children"]))
+        return root
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the component tree to UTF-8 encoded JSON."""
+        data = self.to_dict()
+        if HAS_ORJSON:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data).encode()
+
+    def _shallow_dict(self) -> dict[str, Any]:
+        """Convert to dictionary with an empty children list."""
         return {
             "id": self.id,
             "type": self.type.value,
             "props": self.props,
-            "children": [child.to_dict() for child in self.children],
+            "children": [],
             "handlers": self.handlers,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class UIState:
     """UI state management."""
 
@@ -83,15 +136,18 @@ class UIState:
         }
 
 
-class AGUIProtocolAdapter(BaseAIProtocolAdapter):
+class AGUIProtocolAdapter(BaseAIProtocolAdapter, protocol_type=ProtocolType.AGUI):
     """AGUI protocol adapter implementation."""
 
     def __init__(self, config: ProtocolConfig):
         """Initialize AGUI adapter."""
         super().__init__(config)
         self._ui_states: dict[str, UIState] = {}
-        self._event_queue: asyncio.Queue = asyncio.Queue()
-        self._update_callbacks: list[Callable[[str, UIState], None]] = []
+        self._event_queue: asyncio.Queue[Message] = asyncio.Queue(
+            maxsize=_EVENT_QUEUE_SIZE
+        )
+        # (callback, is_coroutine_function)
+        self._update_callbacks: list[tuple[Callable[[str, UIState], Any], bool]] = []
 
     async def send(self, message: Message) -> None:
         """Send UI update."""
@@ -110,9 +166,9 @@ class AGUIProtocolAdapter(BaseAIProtocolAdapter):
                         state.components[comp.id] = comp
 
                 # Notify callbacks
-                for callback in self._update_callbacks:
+                for callback, is_async in self._update_callbacks:
                     try:
-                        if asyncio.iscoroutinefunction(callback):
+                        if is_async:
                             await callback(session_id, state)
                         else:
                             callback(session_id, state)
@@ -129,6 +185,13 @@ class AGUIProtocolAdapter(BaseAIProtocolAdapter):
         except TimeoutError:
             return None
 
+    def receive_nowait(self) -> Message | None:
+        """Return a queued UI event without waiting, or None if there is none."""
+        try:
+            return self._event_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
     async def connect(self) -> None:
         """Start AGUI protocol."""
         self._connected = True
@@ -149,24 +212,43 @@ class AGUIProtocolAdapter(BaseAIProtocolAdapter):
         return self._ui_states.get(session_id)
 
     def _parse_component(self, data: dict) -> UIComponent:
-        """Parse component from data."""
-        comp = UIComponent(
+        """Parse component from data.
+
+        Iterative, like ``UIComponent.to_dict``.
+        """
+        root = self._parse_node(data)
+        worklist = [(root, data)]
+        while worklist:
+            comp, comp_data = worklist.pop()
+            for child_data in comp_data.get("children", ()):
+                child = self._parse_node(child_data)
+                comp.children.append(child)
+                if child_data.get("children"):
+                    worklist.append((child, child_data))
+        return root
+
+    @staticmethod
+    def _parse_node(data: dict[str, Any]) -> UIComponent:
+        """Parse a single component, without its children."""
+        try:
+            component_type = _COMPONENT_TYPES[data["type"]]
+        except KeyError:
+            raise ValueError(f"{data['type']!r} is not a valid ComponentType") from None
+        return UIComponent(
             id=data["id"],
-            type=ComponentType(data["type"]),
+            type=component_type,
             props=data.get("props", {}),
             handlers=data.get("handlers", {}),
         )
 
-        # Parse children
-        for child_data in data.get("children", []):
-            comp.children.append(self._parse_component(child_data))
-
-        return comp
-
     async def emit_event(self, session_id: str, event: dict) -> None:
-        """Emit UI event."""
+        """Emit UI event.
+
+        Waits for room when the event queue is full, so a fast producer is
+        slowed down instead of growing the queue without bound.
+        """
         message = Message(
-            id=str(uuid.uuid4()),
+            id=_fast_id("msg"),
             type="ui_event",
             content=event,
             metadata={"session_id": session_id},
@@ -175,11 +257,7 @@ class AGUIProtocolAdapter(BaseAIProtocolAdapter):
 
     def on_update(self, callback: Callable[[str, UIState], None]) -> None:
         """Register update callback."""
-        self._update_callbacks.append(callback)
-
-
-# Register AGUI adapter
-ProtocolRegistry.register(ProtocolType.AGUI, AGUIProtocolAdapter)
+        self._update_callbacks.append((callback, asyncio.iscoroutinefunction(callback)))
 
 
 class UIBuilder:
@@ -192,7 +270,7 @@ class UIBuilder:
     def text(self, content: str, **props) -> "UIBuilder":
         """Add text component."""
         comp = UIComponent(
-            id=f"text_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("text"),
             type=ComponentType.TEXT,
             props={"content": content, **props},
         )
@@ -202,7 +280,7 @@ class UIBuilder:
     def button(self, label: str, on_click: str | None = None, **props) -> "UIBuilder":
         """Add button component."""
         comp = UIComponent(
-            id=f"button_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("button"),
             type=ComponentType.BUTTON,
             props={"label": label, **props},
         )
@@ -216,7 +294,7 @@ class UIBuilder:
     ) -> "UIBuilder":
         """Add input component."""
         comp = UIComponent(
-            id=f"input_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("input"),
             type=ComponentType.INPUT,
             props={"placeholder": placeholder, "defaultValue": default_value, **props},
         )
@@ -228,7 +306,7 @@ class UIBuilder:
     ) -> "UIBuilder":
         """Add select component."""
         comp = UIComponent(
-            id=f"select_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("select"),
             type=ComponentType.SELECT,
             props={"options": options, "defaultValue": default, **props},
         )
@@ -238,7 +316,7 @@ class UIBuilder:
     def container(self, children: list[UIComponent], **props) -> "UIBuilder":
         """Add container component."""
         comp = UIComponent(
-            id=f"container_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("container"),
             type=ComponentType.CONTAINER,
             props=props,
             children=children,
@@ -251,7 +329,7 @@ class UIBuilder:
     ) -> "UIBuilder":
         """Add form component."""
         comp = UIComponent(
-            id=f"form_{uuid.uuid4().hex[:8]}",
+            id=_fast_id("form"),
             type=ComponentType.FORM,
             props=props,
             children=children,
@@ -281,7 +359,21 @@ class SkillAGUI(Skill):
         self.session_id = session_id or str(uuid.uuid4())
         self._auto_render = auto_render
         self._ui_state: UIState | None = None
-        self._event_handlers: dict[str, Callable] = {}
+        # Shared by every ui_update message of this session
+        self._update_metadata = {"session_id": self.session_id}
+        # handler_id -> (handler, is_coroutine_function)
+        self._event_handlers: dict[str, tuple[Callable, bool]] = {}
+        # Dialog button ID -> (label, future of the dialog it belongs to)
+        self._dialog_buttons: dict[str, tuple[str, asyncio.Future[str]]] = {}
+        self._dialog_handler = (self._resolve_dialog, False)
+        # Updates waiting for the next flush, merged by component ID / key
+        self._pending_components: dict[str, UIComponent] = {}
+        self._pending_values: dict[str, Any] = {}
+        self._flush_timer: asyncio.TimerHandle | None = None
+        # Resolved once the pending updates have been sent
+        self._flushed: asyncio.Future[None] | None = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self._events_task: asyncio.Task[None] | None = None
 
     def _create_enhanced_brick(self, brick: NanobrickBase) -> NanobrickEnhanced:
         """Create enhanced brick with AGUI capabilities."""
@@ -363,75 +455,136 @@ class SkillAGUI(Skill):
 
         # Create session
         self._ui_state = self._adapter.create_session(self.session_id)
+        self._update_metadata = {"session_id": self.session_id}
 
-        # Start event handler
-        asyncio.create_task(self._handle_events())
+        # Start event handler, unless one is still running from before
+        if self._events_task is None or self._events_task.done():
+            self._events_task = asyncio.create_task(self._handle_events())
 
     async def disconnect(self) -> None:
-        """Disconnect from AGUI system."""
-        if self._adapter:
-            await self._adapter.disconnect()
+        """Disconnect from AGUI system.
+
+        Pending updates are flushed first; if that send fails, the error is
+        raised after the event worker is stopped and the adapter disconnected.
+        """
+        try:
+            if self._flushed is not None:
+                flushed = self._flushed
+                self._flush()
+                await asyncio.shield(flushed)
+        finally:
+            task, self._events_task = self._events_task, None
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+            if self._adapter:
+                await self._adapter.disconnect()
 
     def create_ui(self) -> UIBuilder:
         """Create UI builder."""
         return UIBuilder()
 
     async def render(self, components: list[UIComponent] | UIBuilder) -> None:
-        """Render UI components."""
+        """Render UI components.
+
+        Updates issued within a few milliseconds of each other are sent as a
+        single ``ui_update`` message; this returns once that message is sent.
+        """
         if isinstance(components, UIBuilder):
             components = components.build()
 
         # Update UI state
         for comp in components:
             self._ui_state.components[comp.id] = comp
+            self._pending_components[comp.id] = comp
 
-            # Register handlers
-            for event, handler_id in comp.handlers.items():
-                if handler_id in self._event_handlers:
-                    # Link component to handler
-                    comp.handlers[event] = handler_id
-
-        # Send update
-        message = Message(
-            id=str(uuid.uuid4()),
-            type="ui_update",
-            content={"components": [comp.to_dict() for comp in components]},
-            metadata={"session_id": self.session_id},
-        )
-        await self._adapter.send(message)
+        await asyncio.shield(self._schedule_flush())
 
     async def update_ui(self, updates: dict[str, Any]) -> None:
-        """Update UI state."""
+        """Update UI state.
+
+        Batched with other pending updates, like ``render``.
+        """
         # Update values
         for key, value in updates.items():
             self._ui_state.set_value(key, value)
-
-        # Send update
+        self._pending_values.update(updates)
+
+        await asyncio.shield(self._schedule_flush())
+
+    def _schedule_flush(self) -> asyncio.Future[None]:
+        """Arrange for pending updates to be sent and return their future."""
+        loop = asyncio.get_running_loop()
+        if self._flushed is None:
+            self._flushed = loop.create_future()
+        flushed = self._flushed
+        pending = len(self._pending_components) + len(self._pending_values)
+        if pending >= _MAX_PENDING_UPDATES:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(_FLUSH_DELAY, self._flush)
+        return flushed
+
+    def _flush(self) -> None:
+        """Send all pending updates as one message."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        flushed, self._flushed = self._flushed, None
+        if flushed is None:
+            return
+        components, self._pending_components = self._pending_components, {}
+        values, self._pending_values = self._pending_values, {}
+        task = asyncio.create_task(self._send_update(components, values, flushed))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_update(
+        self,
+        components: dict[str, UIComponent],
+        values: dict[str, Any],
+        flushed: asyncio.Future[None],
+    ) -> None:
+        """Send one merged ``ui_update`` message and resolve its waiters."""
+        content: dict[str, Any] = {}
+        if components:
+            content["components"] = [comp.to_dict() for comp in components.values()]
+        if values:
+            content["values"] = values
         message = Message(
-            id=str(uuid.uuid4()),
+            id=_fast_id("msg"),
             type="ui_update",
-            content={"values": updates},
-            metadata={"session_id": self.session_id},
+            content=content,
+            metadata=self._update_metadata,
         )
-        await self._adapter.send(message)
+        try:
+            await self._adapter.send(message)
+        except Exception as e:
+            if not flushed.done():
+                flushed.set_exception(e)
+        else:
+            if not flushed.done():
+                flushed.set_result(None)
 
     def on_event(self, event_id: str, handler: Callable) -> None:
         """Register event handler."""
-        self._event_handlers[event_id] = handler
+        self._event_handlers[event_id] = (
+            handler,
+            asyncio.iscoroutinefunction(handler),
+        )
 
     async def show_dialog(
         self, title: str, content: str | list[UIComponent], buttons: list[str] = ["OK"]
     ) -> str:
         """Show dialog and wait for response."""
-        dialog_id = f"dialog_{uuid.uuid4().hex[:8]}"
-        result_future = asyncio.Future()
+        dialog_id = _fast_id("dialog")
+        result_future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
 
         # Build dialog
         dialog_content = []
         if isinstance(content, str):
             dialog_content.append(
                 UIComponent(
-                    id=f"dialog_text_{uuid.uuid4().hex[:8]}",
+                    id=_fast_id("dialog_text"),
                     type=ComponentType.TEXT,
                     props={"content": content},
                 )
@@ -442,7 +595,7 @@ class SkillAGUI(Skill):
         # Add buttons
         button_components = []
         for button_label in buttons:
-            button_id = f"dialog_button_{button_label}_{uuid.uuid4().hex[:8]}"
+            button_id = _fast_id(f"dialog_button_{button_label}")
             button_components.append(
                 UIComponent(
                     id=button_id,
@@ -452,14 +605,9 @@ class SkillAGUI(Skill):
                 )
             )
 
-            # Register handler
-            def make_handler(label):
-                async def handler(event):
-                    result_future.set_result(label)
-
-                return handler
-
-            self.on_event(button_id, make_handler(button_label))
+            # All dialog buttons share one handler that looks up the label
+            self._dialog_buttons[button_id] = (button_label, result_future)
+            self._event_handlers[button_id] = self._dialog_handler
 
         # Create dialog component
         dialog = UIComponent(
@@ -469,27 +617,63 @@ class SkillAGUI(Skill):
             children=dialog_content + button_components,
         )
 
-        # Render dialog
-        await self.render([dialog])
-
-        # Wait for result
-        return await result_future
+        try:
+            # Render dialog
+            await self.render([dialog])
+
+            # Wait for result
+            return await result_future
+        finally:
+            for button in button_components:
+                self._dialog_buttons.pop(button.id, None)
+                self._event_handlers.pop(button.id, None)
+
+    def _resolve_dialog(self, event: dict[str, Any]) -> None:
+        """Resolve the dialog whose button was clicked with the button label."""
+        entry = self._dialog_buttons.get(event.get("handler_id", ""))
+        if entry is not None:
+            label, result_future = entry
+            if not result_future.done():
+                result_future.set_result(label)
 
     async def _handle_events(self) -> None:
         """Handle UI events."""
-        while self._adapter and self._adapter.is_connected():
+        adapter = self._adapter
+        while adapter and adapter.is_connected():
             try:
-                event_msg = await self._adapter.receive()
-                if event_msg and event_msg.type == "ui_event":
-                    event = event_msg.content
-                    handler_id = event.get("handler_id")
-
-                    if handler_id and handler_id in self._event_handlers:
-                        handler = self._event_handlers[handler_id]
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(event)
-                        else:
-                            handler(event)
+                # Wait only for the first event of a burst, then prefetch the
+                # rest without paying receive()'s timeout per event
+                event_msg = await adapter.receive()
+                batch = []
+                while event_msg is not None:
+                    batch.append(event_msg)
+                    if len(batch) == _EVENT_BATCH_SIZE:
+                        break
+                    event_msg = adapter.receive_nowait()
+                await self._dispatch_batch(batch)
             except Exception:
                 # Continue on errors
                 await asyncio.sleep(0.1)
+
+    async def _dispatch_batch(self, batch: list[Message]) -> None:
+        """Run the handlers registered for a batch of UI event messages.
+
+        Sync handlers are called back to back; only async handlers suspend.
+        """
+        handlers = self._event_handlers
+        for event_msg in batch:
+            if event_msg.type != "ui_event":
+                continue
+            event = event_msg.content
+            entry = handlers.get(event.get("handler_id"))
+            if entry is None:
+                continue
+            handler, is_async = entry
+            try:
+                if is_async:
+                    await handler(event)
+                else:
+                    handler(event)
+            except Exception:
+                # One failing handler must not drop the rest of the batch
+                pass
@@ -1,6 +1,7 @@
 """Tests for package registry functionality."""
 
 import tempfile
+from dataclasses import FrozenInstanceError
 from pathlib import Path
 
 import pytest
@@ -17,7 +18,7 @@ from nanobricks.registry import (
     find_best_version,
     resolve_dependencies,
 )
-from nanobricks.registry.version import VersionPart
+from nanobricks.registry.version import VersionPart, _parse_constraint
 
 
 class TestVersion:
@@ -57,6 +58,12 @@ class TestVersion:
         assert v.prerelease == "rc.1"
         assert v.build == "build.456"
 
+    def test_parse_invalid_version(self):
+        """Test rejecting malformed versions."""
+        for bad in ["1.2", "01.2.3", "1.2.3-", "1.2.3-01", "1.2.3-a..b", "1.2.3+"]:
+            with pytest.raises(ValueError):
+                Version.parse(bad)
+
     def test_version_comparison(self):
         """Test version comparison."""
         v1 = Version.parse("1.0.0")
@@ -71,6 +78,25 @@ class TestVersion:
         assert v1 == v1
         assert v1 != v2
 
+    def test_build_metadata_ignored_for_equality(self):
+        """Test that build metadata does not affect equality or hashing."""
+        v1 = Version.parse("1.0.0+build.1")
+        v2 = Version.parse("1.0.0+build.2")
+
+        assert v1 == v2
+        assert hash(v1) == hash(v2)
+        assert len({v1, v2, Version.parse("1.0.0")}) == 1
+        assert str(v1) == "1.0.0+build.1"
+
+    def test_version_is_immutable(self):
+        """Test versions cannot change after their ordering key is computed."""
+        v = Version.parse("1.0.0")
+
+        with pytest.raises(FrozenInstanceError):
+            v.major = 3
+        assert v < Version.parse("2.0.0")
+        assert hash(v) == hash(Version.parse("1.0.0"))
+
     def test_prerelease_comparison(self):
         """Test prerelease version comparison."""
         v1 = Version.parse("1.0.0-alpha")
@@ -80,6 +106,22 @@ class TestVersion:
 
         assert v1 < v2 < v3 < v4
 
+    def test_semver_precedence_order(self):
+        """Test full SemVer precedence example ordering."""
+        ordered = [
+            "1.0.0-alpha",
+            "1.0.0-alpha.1",
+            "1.0.0-alpha.beta",
+            "1.0.0-beta",
+            "1.0.0-beta.2",
+            "1.0.0-beta.11",
+            "1.0.0-rc.1",
+            "1.0.0",
+        ]
+        versions = [Version.parse(v) for v in reversed(ordered)]
+
+        assert [str(v) for v in sorted(versions)] == ordered
+
     def test_version_bump(self):
         """Test version bumping."""
         v = Version.parse("1.2.3")
@@ -113,6 +155,14 @@ class TestVersionRange:
         assert r.contains(v1)
         assert not r.contains(v2)
 
+    def test_exact_pin_ignores_build_only(self):
+        """Test exact pins match build variants but not prereleases."""
+        r = VersionRange.parse("==1.0.0")
+
+        assert r.contains(Version.parse("1.0.0+build.7"))
+        assert not r.contains(Version.parse("1.0.0-rc.1"))
+        assert not r.contains(Version.parse("1.0.1"))
+
     def test_parse_minimum_version(self):
         """Test minimum version range."""
         r = VersionRange.parse(">=1.0.0")
@@ -150,6 +200,29 @@ class TestVersionRange:
         assert r.contains(Version.parse("1.5.0"))
         assert not r.contains(Version.parse("2.0.0"))
 
+    def test_exclusive_and_inclusive_bounds(self):
+        """Test every combination of bound inclusivity."""
+        v1 = Version.parse("1.0.0")
+        v2 = Version.parse("2.0.0")
+
+        assert not VersionRange.parse(">1.0.0,<2.0.0").contains(v1)
+        assert not VersionRange.parse(">1.0.0,<2.0.0").contains(v2)
+        assert VersionRange.parse(">1.0.0,<=2.0.0").contains(v2)
+        assert VersionRange.parse(">=1.0.0,<2.0.0").contains(v1)
+        assert VersionRange.parse("<=2.0.0").contains(v2)
+        assert VersionRange().contains(v1)
+
+    def test_version_range_is_immutable(self):
+        """Test bounds cannot change after the predicate is compiled."""
+        r = VersionRange()
+
+        with pytest.raises(FrozenInstanceError):
+            r.min_version = Version.parse("2.0.0")
+        assert r.contains(Version.parse("1.0.0"))
+        assert not VersionRange(min_version=Version.parse("2.0.0")).contains(
+            Version.parse("1.0.0")
+        )
+
     def test_find_best_version(self):
         """Test finding best version."""
         versions = [
@@ -174,6 +247,35 @@ class TestVersionRange:
         best3 = find_best_version(versions, r2, prefer_stable=False)
         assert str(best3) == "2.0.0"  # Still picks stable when available
 
+    def test_find_best_version_prerelease_fallback(self):
+        """Test falling back to prereleases when no stable version matches."""
+        versions = [
+            Version.parse("3.0.0-alpha"),
+            Version.parse("3.0.0-rc.1"),
+            Version.parse("3.0.0-beta"),
+            Version.parse("2.0.0"),
+        ]
+
+        r = VersionRange.parse(">=3.0.0-alpha")
+        assert str(find_best_version(versions, r)) == "3.0.0-rc.1"
+        assert find_best_version(versions, VersionRange.parse(">=4.0.0")) is None
+
+    def test_find_best_version_sorted_desc(self):
+        """Test the early-exit scan over newest-first version lists."""
+        versions = sorted(
+            Version.parse(v)
+            for v in ["3.0.0-rc.1", "2.1.0", "2.0.0", "2.0.0-beta", "1.0.0"]
+        )[::-1]
+
+        r = VersionRange.parse(">=2.0.0-beta")
+        assert str(find_best_version(versions, r, sorted_desc=True)) == "2.1.0"
+        assert (
+            str(find_best_version(versions, r, prefer_stable=False, sorted_desc=True))
+            == "3.0.0-rc.1"
+        )
+        r2 = VersionRange.parse(">=3.0.0-alpha")
+        assert str(find_best_version(versions, r2, sorted_desc=True)) == "3.0.0-rc.1"
+
 
 class TestPackageMetadata:
     """Test package metadata."""
@@ -479,3 +581,16 @@ class TestRegistryClient:
 
         assert str(resolved["brick-a"]) == "1.1.0"  # Latest 1.x
         assert str(resolved["brick-b"]) == "1.0.0"  # Latest available
+
+    def test_cached_constraints_are_immutable(self):
+        """Test a shared cached constraint cannot be corrupted by a caller."""
+        constraint = _parse_constraint("^1.0.0")
+
+        with pytest.raises(FrozenInstanceError):
+            constraint.max_version = None
+        assert _parse_constraint("^1.0.0") is constraint
+        resolved = resolve_dependencies(
+            {"brick-a": "^1.0.0"},
+            {"brick-a": [Version.parse("1.1.0"), Version.parse("2.0.0")]},
+        )
+        assert str(resolved["brick-a"]) == "1.1.0"
@@ -35,6 +35,23 @@ class TestInputSanitizer:
 
     # test_sql_escape removed - implementation details differ
 
+    @pytest.mark.asyncio
+    async def test_escape_without_special_chars_keeps_string(self):
+        """Test that clean strings pass through unchanged."""
+        brick = InputSanitizer(EchoNanobrick(), html_escape=True, sql_escape=True)
+        value = "plain text 123"
+
+        result = await brick.invoke(value)
+        assert result is value
+
+    @pytest.mark.asyncio
+    async def test_sql_escape_only(self):
+        """Test SQL escaping without HTML escaping."""
+        brick = InputSanitizer(EchoNanobrick(), html_escape=False, sql_escape=True)
+
+        result = await brick.invoke("O'Reilly \\ <b>")
+        assert result == "O''Reilly \\\\ <b>"
+
     @pytest.mark.asyncio
     async def test_max_length(self):
         """Test max length enforcement."""
@@ -45,6 +62,29 @@ class TestInputSanitizer:
 
     # test_allowed_chars removed - implementation details differ
 
+    @pytest.mark.asyncio
+    async def test_allowed_chars_filtering(self):
+        """Test whitelisting with Latin-1 and non-Latin-1 allowed sets."""
+        latin = InputSanitizer(
+            EchoNanobrick(), html_escape=False, sql_escape=False, allowed_chars="abé"
+        )
+        wide = InputSanitizer(
+            EchoNanobrick(), html_escape=False, sql_escape=False, allowed_chars="ab€"
+        )
+
+        assert await latin.invoke("a-b-é-€-ü") == "abé"
+        assert await wide.invoke("a-b-é-€-ü") == "ab€"
+
+    @pytest.mark.asyncio
+    async def test_options_changed_after_init(self):
+        """Test that changing an option rebuilds the sanitizer."""
+        brick = InputSanitizer(EchoNanobrick(), html_escape=False, sql_escape=False)
+        assert await brick.invoke("<b>") == "<b>"
+
+        brick.html_escape = True
+        brick.max_length = 2
+        assert await brick.invoke("<b>") == "&lt;b"
+
     @pytest.mark.asyncio
     async def test_nested_sanitization(self):
         """Test sanitization of nested structures."""
@@ -58,6 +98,19 @@ class TestInputSanitizer:
         assert "&lt;script&gt;" in result
         assert "&lt;img&gt;" in result
 
+    def test_nested_containers_copied_only_when_changed(self):
+        """Test that clean containers are reused and dirty ones rebuilt."""
+        brick = InputSanitizer(EchoNanobrick(), html_escape=True)
+        clean = {"a": ["x", ("y", 1)], "b": {"c": "ok"}}
+        dirty = {"a": ["x", ("<b>", 1)], "b": {"c": "ok"}}
+
+        assert brick._sanitize_value(clean) is clean
+
+        result = brick._sanitize_value(dirty)
+        assert result == {"a": ["x", ("&lt;b&gt;", 1)], "b": {"c": "ok"}}
+        assert result["b"] is dirty["b"]
+        assert dirty["a"][1][0] == "<b>"
+
     # test_combined_sanitization removed - implementation details differ
 
     @pytest.mark.asyncio
@@ -71,6 +71,20 @@ class TestSkill:
         result = asyncio.run(enhanced.invoke("test"))
         assert result == "*** test"
 
+    def test_skill_name(self):
+        """Test skill names are derived per class and can be overridden."""
+
+        class CachingSkill(Skill[str, str, None]):
+            def _create_enhanced_brick(self, brick):
+                return brick
+
+        class RenamedSkill(CachingSkill):
+            name = "custom"
+
+        assert CachingSkill.name == "caching"
+        assert CachingSkill().name == "caching"
+        assert RenamedSkill().name == "custom"
+
 
 class TestSkillRegistry:
     """Test the skill registry."""
@@ -275,3 +289,26 @@ class TestSkillDecorator:
         result = asyncio.run(brick.invoke("test"))
         # Inner decorator (***) applies first, then outer (>>>)
         assert result == ">>>***test***>>>"
+
+    def test_decorator_exposes_skill_methods(self):
+        """Test methods added by the enhanced brick are available on the class."""
+
+        class GreetSkill(Skill[str, str, None]):
+            def _create_enhanced_brick(self, brick):
+                class GreetEnhanced(NanobrickEnhanced[str, str, None]):
+                    async def invoke(self, input: str, *, deps=None) -> str:
+                        return await self._wrapped.invoke(input, deps=deps)
+
+                    def greet(self) -> str:
+                        return f"hello from {self.name}"
+
+                return GreetEnhanced(brick, self)
+
+        @skill(GreetSkill)
+        class GreetBrick(Nanobrick[str, str]):
+            async def invoke(self, input: str, *, deps=None) -> str:
+                return input
+
+        brick = GreetBrick()
+
+        assert brick.greet() == "hello from GreetBrick+greet"
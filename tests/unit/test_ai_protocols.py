@@ -1,10 +1,16 @@
 """Tests for AI protocol adapters and skills."""
 
 import asyncio
+import gc
+import json
+import os
+from dataclasses import FrozenInstanceError
 from datetime import datetime
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
+import aiohttp
 import pytest
+from aiohttp import test_utils, web
 
 from nanobricks.agent.ai_protocol import (
     BaseAIProtocolAdapter,
@@ -13,20 +19,29 @@ from nanobricks.agent.ai_protocol import (
     ProtocolConfig,
     ProtocolRegistry,
     ProtocolType,
+    next_id,
 )
 from nanobricks.protocol import NanobrickBase
-from nanobricks.skills.a2a import A2AMessage, A2AProtocolAdapter, SkillA2A
+from nanobricks.skills.a2a import (
+    A2AMessage,
+    A2ANanobrickEnhanced,
+    A2AProtocolAdapter,
+    SkillA2A,
+)
 from nanobricks.skills.acp import (
     ACPProtocolAdapter,
     RESTEndpoint,
     RESTResponse,
     SkillACP,
+    _json_serialize,
+    _shared_sessions,
 )
 from nanobricks.skills.agui import (
     AGUIProtocolAdapter,
     ComponentType,
     SkillAGUI,
     UIBuilder,
+    UIComponent,
     UIState,
 )
 
@@ -90,6 +105,38 @@ class TestProtocolRegistry:
         assert isinstance(adapter, MockAdapter)
         assert adapter.protocol_type == ProtocolType.CUSTOM
 
+    def test_adapters_register_on_definition(self):
+        """Test adapters declaring a protocol type register themselves."""
+
+        class SelfRegisteringAdapter(
+            BaseAIProtocolAdapter, protocol_type=ProtocolType.CUSTOM
+        ):
+            async def send(self, message: Message) -> None:
+                pass
+
+            async def receive(self):
+                return None
+
+            async def connect(self) -> None:
+                self._connected = True
+
+            async def disconnect(self) -> None:
+                self._connected = False
+
+        adapter = ProtocolRegistry.create(
+            ProtocolConfig(protocol_type=ProtocolType.CUSTOM)
+        )
+        assert isinstance(adapter, SelfRegisteringAdapter)
+        for protocol_type, adapter_class in [
+            (ProtocolType.A2A, A2AProtocolAdapter),
+            (ProtocolType.ACP, ACPProtocolAdapter),
+            (ProtocolType.AGUI, AGUIProtocolAdapter),
+        ]:
+            created = ProtocolRegistry.create(
+                ProtocolConfig(protocol_type=protocol_type)
+            )
+            assert isinstance(created, adapter_class)
+
 
 class TestProtocolBridge:
     """Test ProtocolBridge."""
@@ -199,6 +246,146 @@ class TestA2AProtocol:
         await skill.disconnect()
         assert not skill._connected
 
+    @pytest.mark.asyncio
+    async def test_dropped_agent_is_unregistered(self):
+        """Test the adapter does not keep unregistered-but-dropped agents alive."""
+        adapter = A2AProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.A2A))
+        await adapter.connect()
+        skill = SkillA2A(agent_id="ephemeral", adapter=adapter)
+        await skill.connect()
+        assert "ephemeral" in adapter._agents
+
+        del skill
+        gc.collect()
+        assert "ephemeral" not in adapter._agents
+
+    @pytest.mark.asyncio
+    async def test_sync_and_async_handlers(self):
+        """Test dispatch to both sync and async message handlers."""
+        skill = SkillA2A(agent_id="test-agent")
+        received = []
+
+        def sync_handler(msg: A2AMessage):
+            received.append(("sync", msg.content))
+
+        async def async_handler(msg: A2AMessage):
+            received.append(("async", msg.content))
+
+        skill.on_message(sync_handler)
+        skill.on_message(async_handler)
+        await skill._receive_message(A2AMessage(agent_id="test-agent", content="hi"))
+
+        assert received == [("sync", "hi"), ("async", "hi")]
+
+    @pytest.mark.asyncio
+    async def test_failing_handlers_do_not_stop_dispatch(self):
+        """Test a raising handler does not prevent the others from running."""
+        skill = SkillA2A(agent_id="test-agent")
+        received = []
+
+        def broken_sync(msg: A2AMessage):
+            raise ValueError("sync")
+
+        async def broken_async(msg: A2AMessage):
+            raise ValueError("async")
+
+        async def async_handler(msg: A2AMessage):
+            received.append(("async", msg.content))
+
+        skill.on_message(broken_sync)
+        skill.on_message(broken_async)
+        skill.on_message(received.append)
+        skill.on_message(async_handler)
+        message = A2AMessage(agent_id="test-agent", content="hi")
+        await skill._receive_message(message)
+
+        assert received == [message, ("async", "hi")]
+
+    @pytest.mark.asyncio
+    async def test_local_delivery_between_agents(self):
+        """Test that agents on one adapter receive messages directly."""
+        adapter = A2AProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.A2A))
+        alice = SkillA2A(agent_id="alice", adapter=adapter)
+        bob = SkillA2A(agent_id="bob", adapter=adapter)
+        await alice.connect()
+        await bob.connect()
+
+        received = []
+        bob.on_message(received.append)
+        await alice.send_to("bob", {"hello": "bob"})
+
+        assert len(received) == 1
+        assert received[0].content == {"hello": "bob"}
+        assert received[0].conversation_id in alice._conversations
+
+    @pytest.mark.asyncio
+    async def test_conversation_history_is_bounded(self):
+        """Test per-conversation and total conversation limits."""
+        skill = SkillA2A(agent_id="me", max_history=2, max_conversations=2)
+
+        for i in range(3):
+            await skill._receive_message(
+                A2AMessage(agent_id="me", content=i, conversation_id="long")
+            )
+        assert [m.content for m in skill.get_conversation("long")] == [1, 2]
+
+        await skill._receive_message(
+            A2AMessage(agent_id="me", content="a", conversation_id="second")
+        )
+        await skill._receive_message(
+            A2AMessage(agent_id="me", content=3, conversation_id="long")
+        )
+        await skill._receive_message(
+            A2AMessage(agent_id="me", content="b", conversation_id="third")
+        )
+
+        assert skill.get_conversation("second") == []
+        assert [m.content for m in skill.get_conversation("long")] == [2, 3]
+        assert [m.content for m in skill.get_conversation("third")] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_each_peer_once(self):
+        """Test skill and adapter broadcasts deliver once per agent."""
+        adapter = A2AProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.A2A))
+        agents = {name: SkillA2A(agent_id=name, adapter=adapter) for name in "abc"}
+        received = {name: [] for name in agents}
+        for name, agent in agents.items():
+            await agent.connect()
+            agent.on_message(received[name].append)
+
+        agents["a"].add_peer("b")
+        agents["a"].add_peer("c")
+        await agents["a"].broadcast("hello")
+
+        assert [m.content for m in received["b"]] == ["hello"]
+        assert [m.content for m in received["c"]] == ["hello"]
+        assert received["a"] == []
+
+        await adapter.broadcast(
+            A2AMessage(agent_id="a", content="all").to_protocol_message()
+        )
+        assert all(msgs[-1].content == "all" for msgs in received.values())
+        assert [len(msgs) for msgs in received.values()] == [1, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_request_reply_resolved_by_reply_to(self):
+        """Test that replies resolve the pending request by message ID."""
+        skill = SkillA2A(agent_id="requester")
+        await skill.connect()
+
+        task = asyncio.create_task(skill.request_reply("other", "ping", timeout=1.0))
+        while not skill._pending_replies:
+            await asyncio.sleep(0)
+        msg_id = next(iter(skill._pending_replies))
+
+        await skill._receive_message(
+            A2AMessage(agent_id="requester", content="pong", reply_to=msg_id)
+        )
+
+        assert await task == "pong"
+        assert skill._pending_replies == {}
+        await skill.disconnect()
+
     def test_a2a_enhanced_brick(self):
         """Test A2A enhanced brick."""
         # Create mock brick
@@ -216,6 +403,47 @@ class TestA2AProtocol:
         assert hasattr(enhanced, "on_message")
         assert hasattr(enhanced, "request_reply")
 
+    def test_a2a_invoke_sync_reuses_loop(self):
+        """Test sync invocations share one background event loop."""
+        loops = []
+
+        class EchoBrick(NanobrickBase[str, str, None]):
+            async def invoke(self, input: str, *, deps=None) -> str:
+                loops.append(asyncio.get_running_loop())
+                return input
+
+        enhanced = SkillA2A(agent_id="sync").enhance(EchoBrick())
+
+        assert enhanced.invoke_sync("one") == "one"
+        assert enhanced.invoke_sync("two") == "two"
+        assert loops[0] is loops[1]
+        assert not loops[0].is_closed()
+
+    @pytest.mark.asyncio
+    async def test_a2a_invoke_sync_refuses_running_loop(self):
+        """Test sync invocation raises inside any running event loop."""
+
+        class EchoBrick(NanobrickBase[str, str, None]):
+            async def invoke(self, input: str, *, deps=None) -> str:
+                return input
+
+        enhanced = SkillA2A(agent_id="sync-async").enhance(EchoBrick())
+
+        with pytest.raises(RuntimeError, match="async context"):
+            enhanced.invoke_sync("one")
+
+    def test_a2a_enhanced_class_is_shared(self):
+        """Test enhancing bricks reuses one enhanced class."""
+
+        class EchoBrick(NanobrickBase[str, str, None]):
+            async def invoke(self, input: str, *, deps=None) -> str:
+                return input
+
+        first = SkillA2A().enhance(EchoBrick())
+        second = SkillA2A().enhance(EchoBrick())
+
+        assert type(first) is type(second) is A2ANanobrickEnhanced
+
 
 class TestAGUIProtocol:
     """Test AGUI protocol and skill."""
@@ -240,6 +468,23 @@ class TestAGUIProtocol:
         assert not adapter.is_connected()
         assert adapter.get_session("test-session") is None
 
+    @pytest.mark.asyncio
+    async def test_agui_event_queue_applies_backpressure(self, monkeypatch):
+        """Test emit_event waits once the event queue is full."""
+        monkeypatch.setattr("nanobricks.skills.agui._EVENT_QUEUE_SIZE", 2)
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        await adapter.connect()
+        await adapter.emit_event("s", {"n": 0})
+        await adapter.emit_event("s", {"n": 1})
+
+        blocked = asyncio.create_task(adapter.emit_event("s", {"n": 2}))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        assert adapter.receive_nowait().content == {"n": 0}
+        await asyncio.wait_for(blocked, timeout=1)
+        assert [adapter.receive_nowait().content["n"] for _ in range(2)] == [1, 2]
+
     def test_ui_builder(self):
         """Test UI builder."""
         builder = UIBuilder()
@@ -262,6 +507,91 @@ class TestAGUIProtocol:
         # Check button handler
         assert ui[1].handlers.get("click") == "handler1"
 
+    def test_ui_component_deep_tree_round_trip(self):
+        """Test deep component trees serialize and parse without recursion."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        root = UIComponent(id="c0", type=ComponentType.CONTAINER)
+        node = root
+        for depth in range(1, 5000):
+            child = UIComponent(id=f"c{depth}", type=ComponentType.CONTAINER)
+            node.children.append(UIComponent(id=f"t{depth}", type=ComponentType.TEXT))
+            node.children.append(child)
+            node = child
+
+        data = root.to_dict()
+        assert [c["id"] for c in data["children"]] == ["t1", "c1"]
+
+        parsed = adapter._parse_component(data)
+        for depth in range(1, 5000):
+            assert [c.id for c in parsed.children] == [f"t{depth}", f"c{depth}"]
+            parsed = parsed.children[1]
+        assert parsed.children == []
+
+    @pytest.mark.asyncio
+    async def test_agui_update_callbacks(self):
+        """Test sync and async update callbacks are both notified."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        await adapter.connect()
+        state = adapter.create_session("s")
+        calls = []
+
+        async def on_update_async(session_id, ui_state):
+            calls.append(("async", session_id, ui_state))
+
+        adapter.on_update(lambda sid, ui_state: calls.append(("sync", sid, ui_state)))
+        adapter.on_update(on_update_async)
+        await adapter.send(
+            Message(
+                id="1",
+                type="ui_update",
+                content={"components": [{"id": "t", "type": "text"}]},
+                metadata={"session_id": "s"},
+            )
+        )
+
+        assert calls == [("sync", "s", state), ("async", "s", state)]
+        assert state.components["t"].type is ComponentType.TEXT
+
+    def test_parse_component_types(self):
+        """Test component types parse from their values."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        for member in ComponentType:
+            comp = adapter._parse_component({"id": "c", "type": member.value})
+            assert comp.type is member
+        with pytest.raises(ValueError, match="'marquee' is not a valid"):
+            adapter._parse_component({"id": "c", "type": "marquee"})
+
+    def test_ui_component_to_json_bytes(self):
+        """Test components serialize to the JSON of their dict form."""
+        comp = (
+            UIBuilder()
+            .form(UIBuilder().input("Name").build(), on_submit="save", grid={1: 2})
+            .build()[0]
+        )
+
+        assert json.loads(comp.to_json_bytes()) == json.loads(
+            json.dumps(comp.to_dict())
+        )
+
+    def test_ui_component_and_state_use_slots(self):
+        """Test UI components and state carry no per-instance __dict__."""
+        comp = UIComponent(id="c", type=ComponentType.TEXT)
+        assert not hasattr(comp, "__dict__")
+        assert not hasattr(UIState(), "__dict__")
+        with pytest.raises(AttributeError):
+            comp.extra = True
+
+    def test_ui_builder_ids_are_unique(self):
+        """Test generated component IDs keep their kind and do not repeat."""
+        builder = UIBuilder()
+        for _ in range(500):
+            builder.text("a").button("b")
+        ui = builder.build()
+
+        assert len({comp.id for comp in ui}) == len(ui)
+        assert ui[0].id.startswith("text_")
+        assert ui[1].id.startswith("button_")
+
     @pytest.mark.asyncio
     async def test_skill_agui(self):
         """Test SkillAGUI."""
@@ -288,6 +618,167 @@ class TestAGUIProtocol:
         assert call_args.type == "ui_update"
         assert "components" in call_args.content
 
+    @pytest.mark.asyncio
+    async def test_skill_agui_drains_event_bursts(self):
+        """Test a burst of UI events is dispatched in order."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        skill = SkillAGUI(adapter=adapter, session_id="burst")
+        seen = []
+        skill.on_event("sync", lambda event: seen.append(event["n"]))
+
+        async def record(event):
+            seen.append(event["n"])
+
+        skill.on_event("async", record)
+        await skill.connect()
+
+        for n in range(10):
+            handler_id = "async" if n % 2 else "sync"
+            await adapter.emit_event("burst", {"handler_id": handler_id, "n": n})
+        await adapter.emit_event("burst", {"handler_id": "unknown", "n": -1})
+        for _ in range(100):
+            if len(seen) == 10:
+                break
+            await asyncio.sleep(0.01)
+        await skill.disconnect()
+
+        assert seen == list(range(10))
+        assert adapter.receive_nowait() is None
+
+    @pytest.mark.asyncio
+    async def test_skill_agui_event_worker(self):
+        """Test one event worker per connection that survives handler errors."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        skill = SkillAGUI(adapter=adapter, session_id="worker")
+        seen = []
+
+        def fail(event):
+            raise ValueError("boom")
+
+        skill.on_event("fail", fail)
+        skill.on_event("ok", lambda event: seen.append(event["n"]))
+        await skill.connect()
+        worker = skill._events_task
+        await skill.connect()
+        assert skill._events_task is worker
+
+        for n in range(100):
+            await adapter.emit_event(
+                "worker", {"handler_id": "fail" if n % 3 == 0 else "ok", "n": n}
+            )
+        for _ in range(100):
+            if len(seen) == 66:
+                break
+            await asyncio.sleep(0.01)
+        assert seen == [n for n in range(100) if n % 3]
+
+        await skill.disconnect()
+        await asyncio.sleep(0)
+        assert worker.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_skill_agui_coalesces_updates(self):
+        """Test concurrent renders and updates go out as one message."""
+        skill = SkillAGUI(session_id="test-session")
+        adapter = Mock(spec=AGUIProtocolAdapter)
+        adapter.send = AsyncMock()
+        skill._adapter = adapter
+        skill._ui_state = UIState()
+
+        first = skill.create_ui().text("one").build()
+        second = skill.create_ui().button("two").build()
+        await asyncio.gather(
+            skill.render(first),
+            skill.render(second),
+            skill.update_ui({"status": "ready"}),
+        )
+
+        adapter.send.assert_called_once()
+        message = adapter.send.call_args[0][0]
+        assert [c["id"] for c in message.content["components"]] == [
+            first[0].id,
+            second[0].id,
+        ]
+        assert message.content["values"] == {"status": "ready"}
+        assert message.metadata == {"session_id": "test-session"}
+
+        # A large batch is flushed without waiting for the timer
+        adapter.send.reset_mock()
+        builder = skill.create_ui()
+        for n in range(200):
+            builder.text(str(n))
+        with patch.object(asyncio.get_running_loop(), "call_later") as call_later:
+            await skill.render(builder)
+        call_later.assert_not_called()
+        adapter.send.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_skill_agui_update_failure_reaches_callers(self):
+        """Test a failed batched send raises in every waiting caller."""
+        skill = SkillAGUI(session_id="test-session")
+        adapter = Mock(spec=AGUIProtocolAdapter)
+        adapter.send = AsyncMock(side_effect=RuntimeError("Not connected"))
+        skill._adapter = adapter
+        skill._ui_state = UIState()
+
+        results = await asyncio.gather(
+            skill.update_ui({"a": 1}),
+            skill.update_ui({"b": 2}),
+            return_exceptions=True,
+        )
+
+        assert adapter.send.call_count == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_skill_agui_disconnect_after_failed_flush(self):
+        """Test disconnect still stops the worker when the last flush fails."""
+        skill = SkillAGUI(session_id="test-session")
+        adapter = Mock(spec=AGUIProtocolAdapter)
+        adapter.send = AsyncMock(side_effect=RuntimeError("send failed"))
+        adapter.disconnect = AsyncMock()
+        skill._adapter = adapter
+        skill._ui_state = UIState()
+        worker = asyncio.create_task(asyncio.sleep(3600))
+        skill._events_task = worker
+
+        update = asyncio.create_task(skill.update_ui({"a": 1}))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="send failed"):
+            await skill.disconnect()
+        with pytest.raises(RuntimeError, match="send failed"):
+            await update
+
+        adapter.disconnect.assert_awaited_once()
+        await asyncio.sleep(0)
+        assert worker.cancelled()
+        assert skill._events_task is None
+
+    @pytest.mark.asyncio
+    async def test_skill_agui_show_dialog(self):
+        """Test a dialog resolves with the clicked button's label."""
+        adapter = AGUIProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.AGUI))
+        skill = SkillAGUI(adapter=adapter, session_id="dialog")
+        await skill.connect()
+
+        dialog_task = asyncio.create_task(
+            skill.show_dialog("Confirm", "Proceed?", buttons=["Yes", "No"])
+        )
+        state = adapter.get_session("dialog")
+        while not state.components:
+            await asyncio.sleep(0.001)
+        (dialog,) = state.components.values()
+        no_button = dialog.children[2]
+        assert no_button.props == {"label": "No"}
+
+        await adapter.emit_event(
+            "dialog", {"handler_id": no_button.handlers["click"], "type": "click"}
+        )
+        assert await asyncio.wait_for(dialog_task, timeout=2) == "No"
+        assert skill._event_handlers == {}
+        assert skill._dialog_buttons == {}
+        await skill.disconnect()
+
     def test_agui_enhanced_brick(self):
         """Test AGUI enhanced brick."""
         # Create mock brick
@@ -327,6 +818,244 @@ class TestACPProtocol:
         endpoint = RESTEndpoint(path="/test", method="GET")
         adapter.register_endpoint("test", endpoint)
         assert adapter.get_endpoint("test") == endpoint
+        assert adapter._endpoints["test"].url == "http://localhost:8000/test"
+
+    @pytest.mark.asyncio
+    async def test_acp_adapters_share_session(self):
+        """Test adapters with the same auth share one pooled session."""
+        config = ProtocolConfig(
+            protocol_type=ProtocolType.ACP,
+            endpoint="http://127.0.0.1:9",
+            auth={"type": "bearer", "token": "test-token"},
+        )
+        first = ACPProtocolAdapter(config)
+        second = ACPProtocolAdapter(config)
+        await first.connect()
+        await second.connect()
+
+        session = first._session
+        assert second._session is session
+        assert session.headers["Authorization"] == "Bearer test-token"
+
+        await first.disconnect()
+        assert not session.closed
+        await second.disconnect()
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_acp_dropped_adapter_releases_shared_session(self):
+        """Test an adapter dropped without disconnect does not pin its session."""
+        config = ProtocolConfig(
+            protocol_type=ProtocolType.ACP,
+            endpoint="http://127.0.0.1:9",
+            auth={"type": "bearer", "token": "dropped-token"},
+        )
+        adapter = ACPProtocolAdapter(config)
+        await adapter.connect()
+        session = adapter._session
+        before = len(_shared_sessions)
+
+        del adapter
+        gc.collect()
+
+        assert len(_shared_sessions) == before - 1
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_acp_concurrent_requests_get_own_responses(self):
+        """Test concurrent sends are answered by their own responses."""
+
+        async def handle(request):
+            body = await request.json()
+            if body["content"] == "slow":
+                await asyncio.sleep(0.05)
+            return web.json_response(
+                {
+                    "echo": body["content"],
+                    "auth": request.headers.get("Authorization"),
+                }
+            )
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            adapter = ACPProtocolAdapter(
+                ProtocolConfig(
+                    protocol_type=ProtocolType.ACP,
+                    endpoint=str(server.make_url("/")),
+                    auth={"type": "bearer", "token": "test-token"},
+                )
+            )
+            await adapter.connect()
+            slow = Message(id="slow-id", type="api_call", content="slow")
+            fast = Message(id="fast-id", type="api_call", content="fast")
+            slow_resp, fast_resp = await asyncio.gather(
+                adapter.send_and_wait(slow), adapter.send_and_wait(fast)
+            )
+            await adapter.disconnect()
+
+        assert slow_resp.metadata["original_message_id"] == "slow-id"
+        assert slow_resp.content["data"] == {
+            "echo": "slow",
+            "auth": "Bearer test-token",
+        }
+        assert fast_resp.content["data"]["echo"] == "fast"
+
+    @pytest.mark.asyncio
+    async def test_acp_health_check_is_opt_in(self):
+        """Test connect only probes /health when strict checking is requested."""
+        probes = []
+
+        async def health(request):
+            probes.append(request.path)
+            return web.Response(status=503)
+
+        app = web.Application()
+        app.router.add_get("/health", health)
+        async with test_utils.TestServer(app) as server:
+            base_url = str(server.make_url("/"))
+            lazy = SkillACP(base_url=base_url)
+            await lazy.connect()
+            assert probes == []
+            await lazy.disconnect()
+
+            strict = SkillACP(base_url=base_url, strict_health_check=True)
+            with pytest.raises(ConnectionError, match="503"):
+                await strict.connect()
+            assert probes == ["/health"]
+            assert not strict._connected
+
+    @pytest.mark.asyncio
+    async def test_acp_skips_unneeded_bodies(self):
+        """Test empty and discarded response bodies are not decoded."""
+
+        async def handle(request):
+            if request.path == "/empty":
+                return web.Response(status=204)
+            return web.json_response({"ignored": True})
+
+        app = web.Application()
+        app.router.add_post("/empty", handle)
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            adapter = ACPProtocolAdapter(
+                ProtocolConfig(
+                    protocol_type=ProtocolType.ACP,
+                    endpoint=str(server.make_url("/")),
+                )
+            )
+            adapter.register_endpoint("empty", RESTEndpoint(path="/empty"))
+            await adapter.connect()
+            empty = await adapter.send_and_wait(
+                Message(
+                    id="1", type="api_call", content={}, metadata={"endpoint": "empty"}
+                )
+            )
+            discarded = await adapter.send_and_wait(
+                Message(
+                    id="2",
+                    type="api_call",
+                    content={},
+                    metadata={"discard_response": True},
+                )
+            )
+            await adapter.disconnect()
+
+        assert empty.content["status"] == 204
+        assert empty.content["data"] is None
+        assert discarded.content["status"] == 200
+        assert discarded.content["data"] is None
+
+    @pytest.mark.asyncio
+    async def test_acp_response_queue_drops_oldest(self):
+        """Test unreceived responses are bounded, keeping the newest."""
+        adapter = ACPProtocolAdapter(ProtocolConfig(protocol_type=ProtocolType.ACP))
+        adapter._connected = True
+        adapter._response_queue = asyncio.Queue(maxsize=2)
+        adapter.send_and_wait = AsyncMock(
+            side_effect=lambda message: Message(
+                id=f"resp-{message.id}", type="rest_response", content={}
+            )
+        )
+
+        for i in range(3):
+            await adapter.send(Message(id=str(i), type="api_call", content={}))
+
+        assert (await adapter.receive()).id == "resp-1"
+        assert (await adapter.receive()).id == "resp-2"
+
+    @pytest.mark.asyncio
+    async def test_acp_empty_chunked_json_body(self):
+        """Test an empty chunked JSON body decodes to None and is not retried."""
+        hits = []
+
+        async def handle(request):
+            hits.append(request.path)
+            response = web.StreamResponse()
+            response.content_type = "application/json"
+            response.enable_chunked_encoding()
+            await response.prepare(request)
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            skill = SkillACP(
+                base_url=str(server.make_url("/")), retry_count=3, retry_delay=0
+            )
+            await skill.connect()
+            response = await skill.call_api("/empty", {})
+            await skill.disconnect()
+
+        assert response.status == 200
+        assert response.data is None
+        assert len(hits) == 1
+
+    @pytest.mark.asyncio
+    async def test_acp_streams_response_body(self):
+        """Test streamed responses hand out the body in chunks."""
+        body = b"x" * 200_000
+
+        async def handle(request):
+            return web.Response(body=body, content_type="application/octet-stream")
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            adapter = ACPProtocolAdapter(
+                ProtocolConfig(
+                    protocol_type=ProtocolType.ACP,
+                    endpoint=str(server.make_url("/")),
+                )
+            )
+            await adapter.connect()
+            response = await adapter.request(
+                Message(
+                    id="1",
+                    type="api_call",
+                    content={},
+                    metadata={"stream_response": True},
+                )
+            )
+            chunks = [chunk async for chunk in response.data]
+            await adapter.disconnect()
+
+        assert response.status == 200
+        assert b"".join(chunks) == body
+
+    def test_acp_json_serialize_non_str_keys(self):
+        """Test request bodies serialize like json.dumps with or without orjson."""
+        body = {1: "one", "nested": {"items": [1, 2.5, None]}}
+
+        assert json.loads(_json_serialize(body)) == json.loads(json.dumps(body))
+
+    def test_acp_message_ids_are_unique(self):
+        """Test process-local message IDs do not repeat."""
+        ids = {next_id() for _ in range(1000)}
+
+        assert len(ids) == 1000
+        assert all(i.startswith(f"{os.getpid()}-") for i in ids)
 
     def test_rest_response(self):
         """Test REST response."""
@@ -343,6 +1072,23 @@ class TestACPProtocol:
         assert data["data"] == {"result": "success"}
         assert "timestamp" in data
 
+        dated = RESTResponse(
+            status=200, data=None, headers={}, timestamp_ns=1_500_000_000 * 10**9
+        )
+        assert dated.timestamp == datetime(2017, 7, 14, 2, 40)
+        assert dated.to_dict()["timestamp"] == "2017-07-14T02:40:00"
+
+    def test_rest_values_are_immutable(self):
+        """Test endpoints and responses are frozen, slotted values."""
+        endpoint = RESTEndpoint(path="/test")
+        response = RESTResponse(status=200, data=None, headers={})
+
+        with pytest.raises(FrozenInstanceError):
+            endpoint.path = "/other"
+        with pytest.raises(FrozenInstanceError):
+            response.status = 500
+        assert not hasattr(endpoint, "__dict__")
+
     @pytest.mark.asyncio
     async def test_skill_acp(self):
         """Test SkillACP."""
@@ -355,13 +1101,8 @@ class TestACPProtocol:
         adapter = Mock(spec=ACPProtocolAdapter)
         adapter.is_connected = Mock(return_value=True)
         adapter.connect = AsyncMock()
-        adapter.send = AsyncMock()
-        adapter.receive = AsyncMock(
-            return_value=Message(
-                id="resp-123",
-                type="rest_response",
-                content={"status": 200, "data": {"result": "ok"}, "headers": {}},
-            )
+        adapter.request = AsyncMock(
+            return_value=RESTResponse(status=200, data={"result": "ok"}, headers={})
         )
         skill._adapter = adapter
 
@@ -372,6 +1113,217 @@ class TestACPProtocol:
         assert response.status == 200
         assert response.data == {"result": "ok"}
 
+    @pytest.mark.asyncio
+    async def test_stream_to_api_batches(self):
+        """Test streaming drains queued items into full batches."""
+        skill = SkillACP()
+        skill.call_api = AsyncMock()
+        stream = asyncio.Queue()
+        for i in range(25):
+            stream.put_nowait(i)
+        stream.put_nowait(None)
+
+        await asyncio.wait_for(skill.stream_to_api("/ingest", stream), timeout=0.5)
+
+        counts = [call.args[1]["count"] for call in skill.call_api.await_args_list]
+        assert counts == [10, 10, 5]
+        assert skill.call_api.await_args_list[2].args[1]["batch"] == [
+            20,
+            21,
+            22,
+            23,
+            24,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_call_api_batch_coalesces_concurrent_calls(self):
+        """Test batched calls share one request and get their own results."""
+
+        async def answer(message):
+            results = [
+                {"doubled": item["content"] * 2} for item in message.content["batch"]
+            ]
+            return RESTResponse(status=200, data={"batch": results}, headers={})
+
+        skill = SkillACP()
+        skill._adapter = Mock(spec=ACPProtocolAdapter)
+        skill._adapter.request = AsyncMock(side_effect=answer)
+
+        responses = await asyncio.gather(
+            *(skill.call_api("/double", i, batch=True) for i in range(3))
+        )
+
+        assert skill._adapter.request.await_count == 1
+        assert [r.data for r in responses] == [
+            {"doubled": 0},
+            {"doubled": 2},
+            {"doubled": 4},
+        ]
+        assert all(r.status == 200 for r in responses)
+
+    def test_acp_invoke_sync_reuses_loop(self):
+        """Test sync invocations share one background event loop."""
+        loops = []
+
+        class EchoBrick(NanobrickBase[str, str, None]):
+            async def invoke(self, input: str, *, deps=None) -> str:
+                loops.append(asyncio.get_running_loop())
+                return input
+
+        skill = SkillACP()
+        skill._adapter = Mock(spec=ACPProtocolAdapter)
+        skill._adapter.connect = AsyncMock()
+        enhanced = skill.enhance(EchoBrick())
+
+        assert enhanced.invoke_sync("one") == "one"
+        assert enhanced.invoke_sync("two") == "two"
+        assert loops[0] is loops[1]
+        skill._adapter.connect.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_call_api_response_handlers(self):
+        """Test sync and async response handlers are called."""
+        skill = SkillACP()
+        skill._adapter = Mock(spec=ACPProtocolAdapter)
+        skill._adapter.request = AsyncMock(
+            return_value=RESTResponse(status=200, data="ok", headers={})
+        )
+        seen = []
+
+        async def async_handler(response):
+            seen.append(("async", response.data))
+
+        skill.on_response("api_call", lambda response: seen.append(response.status))
+        await skill.call_api("/sync", {})
+        skill.on_response("api_call", async_handler)
+        await skill.call_api("/async", {})
+
+        assert seen == [200, ("async", "ok")]
+
+    @pytest.mark.asyncio
+    async def test_call_api_interceptors_apply_in_order(self):
+        """Test interceptors are applied in registration order."""
+        skill = SkillACP()
+        skill._adapter = Mock(spec=ACPProtocolAdapter)
+        skill._adapter.request = AsyncMock(
+            return_value=RESTResponse(status=200, data=None, headers={})
+        )
+
+        def tag(label):
+            def interceptor(message):
+                message.metadata.setdefault("tags", []).append(label)
+                return message
+
+            return interceptor
+
+        skill.add_interceptor(tag("first"))
+        await skill.call_api("/one", {})
+        skill.add_interceptor(tag("second"))
+        await skill.call_api("/two", {})
+
+        sent = [call.args[0] for call in skill._adapter.request.await_args_list]
+        assert sent[0].metadata["tags"] == ["first"]
+        assert sent[1].metadata["tags"] == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_call_api_retries_only_retryable_errors(self):
+        """Test client errors are raised at once and others are retried."""
+
+        def status_error(status):
+            return aiohttp.ClientResponseError(
+                request_info=Mock(), history=(), status=status
+            )
+
+        ok = RESTResponse(status=200, data="ok", headers={})
+        skill = SkillACP(retry_count=3, retry_delay=0)
+        skill._adapter = Mock(spec=ACPProtocolAdapter)
+
+        skill._adapter.request = AsyncMock(side_effect=[status_error(404), ok])
+        with pytest.raises(aiohttp.ClientResponseError):
+            await skill.call_api("/missing", {})
+        assert skill._adapter.request.await_count == 1
+
+        skill._adapter.request = AsyncMock(
+            side_effect=[status_error(503), status_error(429), ok]
+        )
+        assert (await skill.call_api("/flaky", {})).data == "ok"
+        assert skill._adapter.request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_call_api_retries_server_errors(self):
+        """Test a 5xx response from the server is retried."""
+        statuses = [503, 200]
+        hits = []
+
+        async def handle(request):
+            hits.append(request.path)
+            status = statuses[len(hits) - 1]
+            if status != 200:
+                return web.Response(status=status)
+            return web.json_response({"ok": True})
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            skill = SkillACP(
+                base_url=str(server.make_url("/")), retry_count=3, retry_delay=0
+            )
+            await skill.connect()
+            response = await skill.call_api("/flaky", {})
+            await skill.disconnect()
+
+        assert response.status == 200
+        assert response.data == {"ok": True}
+        assert len(hits) == 2
+
+    @pytest.mark.asyncio
+    async def test_call_api_does_not_retry_client_errors(self):
+        """Test a 404 response is returned with its body without retrying."""
+        hits = []
+
+        async def handle(request):
+            hits.append(request.path)
+            return web.json_response({"error": "missing"}, status=404)
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            skill = SkillACP(
+                base_url=str(server.make_url("/")), retry_count=3, retry_delay=0
+            )
+            await skill.connect()
+            response = await skill.call_api("/missing", {})
+            await skill.disconnect()
+
+        assert response.status == 404
+        assert not response.is_success
+        assert response.data == {"error": "missing"}
+        assert len(hits) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_to_api_ends_on_client_errors(self):
+        """Test a batch rejected with a 4xx is not resent forever."""
+        hits = []
+
+        async def handle(request):
+            hits.append(request.path)
+            return web.Response(status=422)
+
+        app = web.Application()
+        app.router.add_post("/agent/message", handle)
+        async with test_utils.TestServer(app) as server:
+            skill = SkillACP(
+                base_url=str(server.make_url("/")), retry_count=3, retry_delay=0
+            )
+            await skill.connect()
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in (1, 2, None):
+                queue.put_nowait(item)
+            await asyncio.wait_for(skill.stream_to_api("/items", queue), timeout=5)
+            await skill.disconnect()
+
+        assert len(hits) == 1
+
     def test_acp_enhanced_brick(self):
         """Test ACP enhanced brick."""
         # Create mock brick
@@ -1,5 +1,6 @@
 """Basic tests for AI protocol adapters and skills."""
 
+from datetime import datetime
 from unittest.mock import Mock
 
 import pytest
@@ -64,6 +65,27 @@ class TestA2ASkill:
         assert msg.reply_to == "msg-123"
         assert msg.conversation_id is not None
 
+    def test_a2a_message_timestamp(self):
+        """Test the integer timestamp and its datetime view."""
+        msg = A2AMessage(
+            agent_id="agent-1", content="hi", timestamp_ns=1_500_000_000 * 10**9
+        )
+
+        assert msg.timestamp == datetime(2017, 7, 14, 2, 40)
+        assert msg.to_protocol_message().metadata["timestamp_ns"] == msg.timestamp_ns
+
+    def test_a2a_message_id_round_trip(self):
+        """Test that an explicit message ID survives protocol conversion."""
+        msg = A2AMessage(agent_id="agent-1", content="hi", id="msg-1")
+
+        assert not hasattr(msg, "__dict__")
+        assert msg.to_protocol_message().id == "msg-1"
+
+        unnamed = A2AMessage(agent_id="agent-1", content="hi")
+        first = unnamed.to_protocol_message()
+        assert unnamed.id == first.id
+        assert unnamed.to_protocol_message().id == first.id
+
     def test_a2a_skill_creation(self):
         """Test creating A2A skill."""
         skill = SkillA2A(agent_id="test-agent")